@@ -0,0 +1,31 @@
+"""Optional Numba support: compiled kernels when numba is installed, plain Python otherwise."""
+
+try:
+    from numba import njit as _numba_njit, types
+except ImportError:
+    _numba_njit = None
+    types = None
+
+NUMBA_AVAILABLE = _numba_njit is not None
+
+if NUMBA_AVAILABLE:
+    # Contiguous float64 arrays. The read-only variants cover arrays
+    # handed out by pandas copy-on-write.
+    F8_1D = types.Array(types.float64, 1, "C")
+    F8_1D_RO = types.Array(types.float64, 1, "C", readonly=True)
+    F8_2D = types.Array(types.float64, 2, "C")
+    F8_2D_RO = types.Array(types.float64, 2, "C", readonly=True)
+else:
+    F8_1D = F8_1D_RO = F8_2D = F8_2D_RO = None
+
+
+def njit(*args, **kwargs):
+    """
+    numba.njit when numba is available; otherwise a no-op decorator accepting
+    the same call forms (@njit, @njit(...), @njit(signatures, ...)).
+    """
+    if NUMBA_AVAILABLE:
+        return _numba_njit(*args, **kwargs)
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return args[0]
+    return lambda fn: fn
@@ -1,74 +1,113 @@
 """WhichTicker — Claude API integration for AI-powered relative performance recommendations."""
 
 import json
-from config import ANTHROPIC_API_KEY, ANTHROPIC_MODEL
+import asyncio
 
+try:
+    import anthropic
+except ImportError:  # AI recommendations are simply disabled without the SDK
+    anthropic = None
 
-def _build_prompt(ticker_a: str, ticker_b: str, stats: dict, technicals: dict, signal: dict) -> str:
-    """Build a structured prompt for relative performance analysis."""
+try:
+    import orjson
+except ImportError:  # stdlib json is used for parsing / cache keys instead
+    orjson = None
 
-    coint = stats.get("cointegration", {})
-    rel_ret = stats.get("relative_returns", {})
+from cache import LRUCache
+from config import ANTHROPIC_API_KEY, ANTHROPIC_MODEL
 
-    # Helper: replace None with "N/A (insufficient data)" for cleaner prompt
-    def _v(val, suffix=""):
-        if val is None:
-            return "N/A (insufficient data)"
-        return f"{val}{suffix}"
+# One client per process so the HTTP connection pool (keep-alive + TLS session)
+# is reused across requests. Created lazily on first use — see _get_client().
+_CLIENT = None
+_CLIENT_LOCK = asyncio.Lock()
+_CLIENT_TIMEOUT = 30.0  # seconds per request
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Retry policy for transient API failures (rate limits / timeouts)
+_RETRY_ATTEMPTS = 3
+_RETRY_BASE_DELAY = 1.0  # seconds; doubles on every attempt
+
+# Message Batches polling (offline sweeps only)
+_BATCH_POLL_INITIAL = 5.0   # seconds before the first status check
+_BATCH_POLL_MAX = 300.0     # cap on the doubling poll interval
+
+# ── Prompt ───────────────────────────────────────────────────────────────────
+# The instructions are identical for every pair, so they live in a constant
+# system block marked as a prompt-cache breakpoint. Keep this string free of
+# interpolation: any byte change invalidates the cached prefix. Everything
+# pair-specific goes into the user message built by _build_prompt().
+# Note: at ~450 tokens the preamble is below the model's minimum cacheable
+# prefix, so the breakpoint is currently inert — it only starts paying off
+# if the instructions grow past that threshold.
+
+STATIC_PREAMBLE = """You are a quantitative analyst evaluating the relative performance of two tickers, A and B.
+The question is: **Will A outperform B going forward?**
+
+The price ratio (A/B) is the key metric — a rising ratio means A is outperforming.
+
+Each request gives the two tickers and, for that pair:
+- Price ratio analysis: current ratio, 50-day and 200-day MAs of the ratio, and whether the ratio is above each MA
+- Momentum: rate of change and direction of the ratio
+- Return comparison: returns of A and B over standard periods and their differential
+- Statistical context: ratio z-score, Pearson correlation, Hurst exponent of the ratio
+  (> 0.5 = trending, good for persistence), ADF p-value of the ratio
+  (> 0.05 = non-stationary = trend continues), cointegration p-value
+- Technical indicators on the ratio A/B: RSI, MACD histogram, technical signals and direction
+- The current statistical signal: direction and strength
 
-    # Extract technical confirmation values before the f-string
-    # (can't use {{}}.get() inside f-strings — {{}} becomes literal "{}" string)
-    tech_conf = technicals.get("confirmation", {})
-    tech_rsi = _v(tech_conf.get("rsi_value"))
-    tech_macd = _v(tech_conf.get("macd_hist"))
-    tech_signals = ", ".join(tech_conf.get("signals", [])) or "N/A"
-    tech_direction = tech_conf.get("direction", "N/A")
+## Your Task
+Respond with a JSON object (and nothing else) containing:
+{
+    "signal": "FAVOR_A" or "FAVOR_B" or "NEUTRAL",
+    "conviction": <integer 1-100>,
+    "recommendation": "<2-3 paragraph analysis explaining which ticker is likely to outperform and why, referencing key metrics>",
+    "risk_factors": ["<risk 1>", "<risk 2>", "<risk 3>"]
+}
 
-    # Format relative returns
-    ret_lines = []
-    for period, data in rel_ret.items():
-        if data.get("differential") is not None:
-            ret_lines.append(
-                f"  - **{period}**: {ticker_a} {data['return_a']:+.1f}% vs {ticker_b} {data['return_b']:+.1f}% "
-                f"(differential: {data['differential']:+.1f}%)"
-            )
-        else:
-            ret_lines.append(f"  - **{period}**: Insufficient data for this period")
-    ret_text = "\n".join(ret_lines) if ret_lines else "  - No return data available"
+Where:
+- FAVOR_A means: A is likely to outperform B
+- FAVOR_B means: B is likely to outperform A
+- NEUTRAL means: no clear relative performance edge
+- conviction is 1-100 scale: 1-20 = very low, 21-40 = low, 41-60 = moderate, 61-80 = high, 81-100 = very high
+
+Refer to the tickers by their symbols in the recommendation.
 
-    # Format above/below MA as clear text
-    def _above(val):
-        if val is True:
-            return "Yes"
-        elif val is False:
-            return "No"
-        return "N/A (insufficient data for this MA)"
+Consider:
+1. Is the ratio trending (above/below MAs)? Is momentum confirming?
+2. What do recent return differentials show — is one consistently outperforming?
+3. Does the Hurst exponent suggest the trend will persist (H > 0.5)?
+4. Are technical indicators aligned with the trend direction?
+5. What could reverse the trend? (sector rotation, valuation, macro events)"""
 
-    return f"""You are a quantitative analyst evaluating the relative performance of {ticker_a} vs {ticker_b}.
-The question is: **Will {ticker_a} outperform {ticker_b} going forward?**
+_SYSTEM_BLOCKS = [
+    {"type": "text", "text": STATIC_PREAMBLE, "cache_control": {"type": "ephemeral"}},
+]
 
-The price ratio (A/B) is the key metric — a rising ratio means {ticker_a} is outperforming.
+# Pair-specific user message, filled in by _render_prompt() via str.format_map
+_USER_TEMPLATE = """Evaluate the relative performance of **{ticker_a}** (A) vs **{ticker_b}** (B).
+Will {ticker_a} outperform {ticker_b} going forward?
 
 ## Price Ratio Analysis
-- **Current Ratio (A/B)**: {_v(stats.get('current_ratio'))}
-- **50-day MA of Ratio**: {_v(stats.get('ratio_ma_50'))}
-- **200-day MA of Ratio**: {_v(stats.get('ratio_ma_200'))}
-- **Ratio above 50d MA?**: {_above(stats.get('ratio_above_ma_50'))}
-- **Ratio above 200d MA?**: {_above(stats.get('ratio_above_ma_200'))}
+- **Current Ratio (A/B)**: {current_ratio}
+- **50-day MA of Ratio**: {ratio_ma_50}
+- **200-day MA of Ratio**: {ratio_ma_200}
+- **Ratio above 50d MA?**: {above_ma_50}
+- **Ratio above 200d MA?**: {above_ma_200}
 
 ## Momentum
-- **Rate of Change**: {_v(stats.get('momentum_roc'), '%')}
-- **Momentum Direction**: {_v(stats.get('momentum_direction'))}
+- **Rate of Change**: {momentum_roc}
+- **Momentum Direction**: {momentum_direction}
 
 ## Return Comparison
-{ret_text}
+{returns}
 
 ## Statistical Context
-- **Ratio Z-Score**: {_v(stats.get('current_zscore'))}
-- **Pearson Correlation**: {_v(stats.get('correlation'))}
-- **Hurst Exponent (ratio)**: {_v(stats.get('hurst_exponent'))} (> 0.5 = trending, good for persistence)
-- **ADF p-value (ratio)**: {_v(stats.get('adf_pvalue'))} (> 0.05 = non-stationary = trend continues)
-- **Cointegration p-value**: {_v(coint.get('p_value'))}
+- **Ratio Z-Score**: {zscore}
+- **Pearson Correlation**: {correlation}
+- **Hurst Exponent (ratio)**: {hurst}
+- **ADF p-value (ratio)**: {adf_pvalue}
+- **Cointegration p-value**: {coint_pvalue}
 
 ## Technical Indicators (on the ratio A/B)
 - **RSI**: {tech_rsi}
@@ -77,30 +116,250 @@ The price ratio (A/B) is the key metric — a rising ratio means {ticker_a} is o
 - **Technical Direction**: {tech_direction}
 
 ## Current Statistical Signal
-- **Direction**: {signal.get('direction', 'N/A')}
-- **Strength**: {signal.get('strength', 'N/A')}
+- **Direction**: {signal_direction}
+- **Strength**: {signal_strength}"""
 
-## Your Task
-Respond with a JSON object (and nothing else) containing:
-{{
-    "signal": "FAVOR_A" or "FAVOR_B" or "NEUTRAL",
-    "conviction": <integer 1-100>,
-    "recommendation": "<2-3 paragraph analysis explaining which ticker is likely to outperform and why, referencing key metrics>",
-    "risk_factors": ["<risk 1>", "<risk 2>", "<risk 3>"]
-}}
+# Rendered user messages keyed by their canonical inputs
+_PROMPT_CACHE = LRUCache(maxsize=128)
 
-Where:
-- FAVOR_A means: {ticker_a} is likely to outperform {ticker_b}
-- FAVOR_B means: {ticker_b} is likely to outperform {ticker_a}
-- NEUTRAL means: no clear relative performance edge
-- conviction is 1-100 scale: 1-20 = very low, 21-40 = low, 41-60 = moderate, 61-80 = high, 81-100 = very high
 
-Consider:
-1. Is the ratio trending (above/below MAs)? Is momentum confirming?
-2. What do recent return differentials show — is one consistently outperforming?
-3. Does the Hurst exponent suggest the trend will persist (H > 0.5)?
-4. Are technical indicators aligned with the trend direction?
-5. What could reverse the trend? (sector rotation, valuation, macro events)"""
+def _build_prompt(ticker_a: str, ticker_b: str, stats: dict, technicals: dict, signal: dict) -> str:
+    """
+    Build the pair-specific user message (the instructions live in STATIC_PREAMBLE).
+    Memoized on a canonical JSON dump of the inputs the prompt actually reads.
+    """
+    key = _canonical_json([ticker_a, ticker_b, stats, technicals.get("confirmation", {}), signal])
+    prompt = _PROMPT_CACHE.get(key)
+    if prompt is None:
+        prompt = _render_prompt(ticker_a, ticker_b, stats, technicals, signal)
+        _PROMPT_CACHE.put(key, prompt)
+    return prompt
+
+
+def _value_or_na(val, suffix=""):
+    """Replace None with "N/A (insufficient data)" for a cleaner prompt."""
+    if val is None:
+        return "N/A (insufficient data)"
+    return f"{val}{suffix}"
+
+
+def _above(val):
+    """Format an above/below-MA flag as clear text."""
+    if val is True:
+        return "Yes"
+    elif val is False:
+        return "No"
+    return "N/A (insufficient data for this MA)"
+
+
+def _render_prompt(ticker_a: str, ticker_b: str, stats: dict, technicals: dict, signal: dict) -> str:
+    coint = stats.get("cointegration", {})
+    rel_ret = stats.get("relative_returns", {})
+    tech_conf = technicals.get("confirmation", {})
+
+    # Format relative returns
+    ret_lines = []
+    for period, data in rel_ret.items():
+        if data.get("differential") is not None:
+            ret_lines.append(
+                f"  - **{period}**: {ticker_a} {data['return_a']:+.1f}% vs {ticker_b} {data['return_b']:+.1f}% "
+                f"(differential: {data['differential']:+.1f}%)"
+            )
+        else:
+            ret_lines.append(f"  - **{period}**: Insufficient data for this period")
+
+    return _USER_TEMPLATE.format_map({
+        "ticker_a":           ticker_a,
+        "ticker_b":           ticker_b,
+        "current_ratio":      _value_or_na(stats.get("current_ratio")),
+        "ratio_ma_50":        _value_or_na(stats.get("ratio_ma_50")),
+        "ratio_ma_200":       _value_or_na(stats.get("ratio_ma_200")),
+        "above_ma_50":        _above(stats.get("ratio_above_ma_50")),
+        "above_ma_200":       _above(stats.get("ratio_above_ma_200")),
+        "momentum_roc":       _value_or_na(stats.get("momentum_roc"), "%"),
+        "momentum_direction": _value_or_na(stats.get("momentum_direction")),
+        "returns":            "\n".join(ret_lines) if ret_lines else "  - No return data available",
+        "zscore":             _value_or_na(stats.get("current_zscore")),
+        "correlation":        _value_or_na(stats.get("correlation")),
+        "hurst":              _value_or_na(stats.get("hurst_exponent")),
+        "adf_pvalue":         _value_or_na(stats.get("adf_pvalue")),
+        "coint_pvalue":       _value_or_na(coint.get("p_value")),
+        "tech_rsi":           _value_or_na(tech_conf.get("rsi_value")),
+        "tech_macd":          _value_or_na(tech_conf.get("macd_hist")),
+        "tech_signals":       ", ".join(tech_conf.get("signals", [])) or "N/A",
+        "tech_direction":     tech_conf.get("direction", "N/A"),
+        "signal_direction":   signal.get("direction", "N/A"),
+        "signal_strength":    signal.get("strength", "N/A"),
+    })
+
+
+def _canonical_json(obj) -> bytes | str:
+    """Deterministic (sorted-key) JSON encoding of obj, used as a cache key."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, sort_keys=True, default=str)
+
+
+def _parse_response(text: str):
+    """
+    Decode the first JSON object in the model's response.
+    A bare object goes straight through orjson; anything else (```json fences,
+    leading prose, trailing commentary) is handled by raw_decode, which starts
+    at the first '{' and stops at its matching close.
+    """
+    start = max(text.find("{"), 0)
+    if orjson is not None and text.endswith("}"):
+        try:
+            return orjson.loads(text[start:])
+        except orjson.JSONDecodeError:
+            pass
+    result, _ = _JSON_DECODER.raw_decode(text, start)
+    return result
+
+
+async def _get_client():
+    """Return the shared AsyncAnthropic client, creating it on first call."""
+    global _CLIENT
+    if _CLIENT is None:
+        async with _CLIENT_LOCK:
+            if _CLIENT is None:
+                # SDK-level retries are disabled — backoff lives in _create_message()
+                _CLIENT = anthropic.AsyncAnthropic(
+                    api_key=ANTHROPIC_API_KEY, max_retries=0, timeout=_CLIENT_TIMEOUT,
+                )
+    return _CLIENT
+
+
+async def _create_message(**kwargs):
+    """
+    Await `messages.create` with exponential backoff on rate-limit and timeout errors.
+    Gives up after _RETRY_ATTEMPTS and re-raises the last error.
+    """
+    client = await _get_client()
+    for attempt in range(_RETRY_ATTEMPTS):
+        try:
+            return await client.messages.create(**kwargs)
+        except (anthropic.RateLimitError, anthropic.APITimeoutError):
+            if attempt == _RETRY_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(_RETRY_BASE_DELAY * (2 ** attempt))
+
+
+def _unavailable_result() -> dict | None:
+    """Result returned when AI is not configured, or None if it is."""
+    if ANTHROPIC_API_KEY and anthropic is not None:
+        return None
+    reason = (
+        "set ANTHROPIC_API_KEY in .env to enable." if not ANTHROPIC_API_KEY
+        else "install the anthropic package to enable."
+    )
+    return {
+        "signal": "N/A",
+        "conviction": 0,
+        "recommendation": f"AI recommendation unavailable — {reason}",
+        "risk_factors": [],
+        "available": False,
+    }
+
+
+def _message_params(ticker_a: str, ticker_b: str, stats: dict, technicals: dict, signal: dict) -> dict:
+    """Keyword arguments for messages.create (also the `params` of a batch request)."""
+    prompt = _build_prompt(ticker_a, ticker_b, stats, technicals, signal)
+    return {
+        "model": ANTHROPIC_MODEL,
+        "max_tokens": 1024,
+        "system": _SYSTEM_BLOCKS,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+
+
+def _interpret_response(text: str) -> dict:
+    """Turn the model's raw text into a validated recommendation dict."""
+    try:
+        result = _parse_response(text)
+    except json.JSONDecodeError:
+        return {
+            "signal": "N/A",
+            "conviction": 0,
+            "recommendation": text or "Failed to parse AI response.",
+            "risk_factors": [],
+            "available": True,
+            "model_used": ANTHROPIC_MODEL,
+            "parse_error": True,
+        }
+
+    result["available"] = True
+    result["model_used"] = ANTHROPIC_MODEL
+
+    # Validate conviction range (1-100)
+    raw_conv = int(result.get("conviction", 50))
+    # Handle legacy 1-5 responses — scale up to 1-100
+    if 1 <= raw_conv <= 5:
+        raw_conv = raw_conv * 20
+    result["conviction"] = max(1, min(100, raw_conv))
+
+    # Map legacy BUY/SELL to new signals
+    sig = result.get("signal", "NEUTRAL").upper()
+    if sig == "BUY":
+        result["signal"] = "FAVOR_A"
+    elif sig == "SELL":
+        result["signal"] = "FAVOR_B"
+    elif sig not in ("FAVOR_A", "FAVOR_B", "NEUTRAL"):
+        result["signal"] = "NEUTRAL"
+
+    return result
+
+
+def _failure_result(e: Exception) -> dict:
+    """Result for a failed API call, with actionable diagnostics for common failure modes."""
+    error_type = type(e).__name__
+    error_msg = str(e)
+
+    if "connect" in error_msg.lower() or "connection" in error_type.lower():
+        diagnosis = (
+            f"AI recommendation failed: Connection error ({error_type}).\n\n"
+            "Possible causes:\n"
+            "• Corporate firewall/proxy blocking api.anthropic.com\n"
+            "• No internet access on this machine\n"
+            "• SSL interception by corporate proxy (try setting SSL_CERT_FILE or REQUESTS_CA_BUNDLE)\n\n"
+            "To test, run: curl -s https://api.anthropic.com/v1/messages -I\n\n"
+            f"Raw error: {error_msg}"
+        )
+    elif "auth" in error_msg.lower() or "api key" in error_msg.lower() or "401" in error_msg:
+        diagnosis = (
+            f"AI recommendation failed: Authentication error ({error_type}).\n\n"
+            "Your ANTHROPIC_API_KEY appears to be invalid or expired.\n"
+            "Check it at: https://console.anthropic.com/settings/keys\n\n"
+            f"Raw error: {error_msg}"
+        )
+    elif "rate" in error_msg.lower() or "429" in error_msg:
+        diagnosis = (
+            f"AI recommendation failed: Rate limited ({error_type}).\n\n"
+            "Too many requests — wait a moment and try again.\n\n"
+            f"Raw error: {error_msg}"
+        )
+    elif "timeout" in error_msg.lower():
+        diagnosis = (
+            f"AI recommendation failed: Request timed out ({error_type}).\n\n"
+            "The Anthropic API took too long to respond. This may be a temporary issue.\n\n"
+            f"Raw error: {error_msg}"
+        )
+    else:
+        diagnosis = f"AI recommendation failed: {error_type} — {error_msg}"
+
+    print(f"  [AI ERROR] {error_type}: {error_msg}")
+
+    return _error_result(diagnosis)
+
+
+def _error_result(recommendation: str) -> dict:
+    return {
+        "signal": "N/A",
+        "conviction": 0,
+        "recommendation": recommendation,
+        "risk_factors": [],
+        "available": False,
+    }
 
 
 async def get_ai_recommendation(
@@ -112,115 +371,68 @@ async def get_ai_recommendation(
 ) -> dict:
     """
     Call Claude API for a relative performance recommendation.
+    Non-blocking — several pairs can be analyzed concurrently via asyncio.gather.
     Returns a dict with signal, conviction, recommendation, risk_factors.
     Gracefully falls back if API key is missing or call fails.
     """
-    if not ANTHROPIC_API_KEY:
-        return {
-            "signal": "N/A",
-            "conviction": 0,
-            "recommendation": "AI recommendation unavailable — set ANTHROPIC_API_KEY in .env to enable.",
-            "risk_factors": [],
-            "available": False,
-        }
+    unavailable = _unavailable_result()
+    if unavailable is not None:
+        return unavailable
 
     try:
-        import anthropic
+        message = await _create_message(**_message_params(ticker_a, ticker_b, stats, technicals, signal))
+        return _interpret_response(message.content[0].text.strip())
+    except Exception as e:
+        return _failure_result(e)
 
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-        prompt = _build_prompt(ticker_a, ticker_b, stats, technicals, signal)
 
-        message = client.messages.create(
-            model=ANTHROPIC_MODEL,
-            max_tokens=1024,
-            messages=[{"role": "user", "content": prompt}],
-        )
+async def get_ai_recommendations_batch(
+    pairs: list[tuple[str, str, dict, dict, dict]],
+) -> list[dict]:
+    """
+    Offline counterpart of get_ai_recommendation() for sweeps over many pairs.
 
-        # Parse the response
-        text = message.content[0].text.strip()
-
-        # Try to extract JSON from the response
-        if "```" in text:
-            start = text.find("{")
-            end = text.rfind("}") + 1
-            if start >= 0 and end > start:
-                text = text[start:end]
-
-        result = json.loads(text)
-        result["available"] = True
-        result["model_used"] = ANTHROPIC_MODEL
-
-        # Validate conviction range (1-100)
-        raw_conv = int(result.get("conviction", 50))
-        # Handle legacy 1-5 responses — scale up to 1-100
-        if 1 <= raw_conv <= 5:
-            raw_conv = raw_conv * 20
-        result["conviction"] = max(1, min(100, raw_conv))
-
-        # Map legacy BUY/SELL to new signals
-        sig = result.get("signal", "NEUTRAL").upper()
-        if sig == "BUY":
-            result["signal"] = "FAVOR_A"
-        elif sig == "SELL":
-            result["signal"] = "FAVOR_B"
-        elif sig not in ("FAVOR_A", "FAVOR_B", "NEUTRAL"):
-            result["signal"] = "NEUTRAL"
-
-        return result
+    Each item of `pairs` is (ticker_a, ticker_b, stats, technicals, signal).
+    All requests go out as one Message Batch (half the per-token price, results
+    within 24h) sharing the same system prompt; the batch is polled with
+    exponential backoff until it ends. Returns one result dict per pair, in
+    input order. Not meant for interactive requests — it can take hours.
+    """
+    unavailable = _unavailable_result()
+    if unavailable is not None:
+        return [dict(unavailable) for _ in pairs]
+    if not pairs:
+        return []
 
-    except json.JSONDecodeError:
-        return {
-            "signal": "N/A",
-            "conviction": 0,
-            "recommendation": text if 'text' in dir() else "Failed to parse AI response.",
-            "risk_factors": [],
-            "available": True,
-            "model_used": ANTHROPIC_MODEL,
-            "parse_error": True,
-        }
+    try:
+        client = await _get_client()
+        # custom_id only allows [A-Za-z0-9_-], so key by position rather than ticker
+        batch = await client.messages.batches.create(requests=[
+            {"custom_id": f"pair-{i}", "params": _message_params(*pair)}
+            for i, pair in enumerate(pairs)
+        ])
+
+        delay = _BATCH_POLL_INITIAL
+        while batch.processing_status != "ended":
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _BATCH_POLL_MAX)
+            batch = await client.messages.batches.retrieve(batch.id)
+
+        results = [None] * len(pairs)
+        async for entry in await client.messages.batches.results(batch.id):
+            i = int(entry.custom_id.removeprefix("pair-"))
+            if entry.result.type == "succeeded":
+                # One malformed reply must not discard the rest of the batch
+                try:
+                    results[i] = _interpret_response(entry.result.message.content[0].text.strip())
+                except Exception as e:
+                    results[i] = _failure_result(e)
+            else:
+                results[i] = _error_result(f"AI recommendation failed: batch request {entry.result.type}.")
     except Exception as e:
-        error_type = type(e).__name__
-        error_msg = str(e)
-
-        # Provide actionable diagnostics for common failure modes
-        if "connect" in error_msg.lower() or "connection" in error_type.lower():
-            diagnosis = (
-                f"AI recommendation failed: Connection error ({error_type}).\n\n"
-                "Possible causes:\n"
-                "• Corporate firewall/proxy blocking api.anthropic.com\n"
-                "• No internet access on this machine\n"
-                "• SSL interception by corporate proxy (try setting SSL_CERT_FILE or REQUESTS_CA_BUNDLE)\n\n"
-                "To test, run: curl -s https://api.anthropic.com/v1/messages -I\n\n"
-                f"Raw error: {error_msg}"
-            )
-        elif "auth" in error_msg.lower() or "api key" in error_msg.lower() or "401" in error_msg:
-            diagnosis = (
-                f"AI recommendation failed: Authentication error ({error_type}).\n\n"
-                "Your ANTHROPIC_API_KEY appears to be invalid or expired.\n"
-                "Check it at: https://console.anthropic.com/settings/keys\n\n"
-                f"Raw error: {error_msg}"
-            )
-        elif "rate" in error_msg.lower() or "429" in error_msg:
-            diagnosis = (
-                f"AI recommendation failed: Rate limited ({error_type}).\n\n"
-                "Too many requests — wait a moment and try again.\n\n"
-                f"Raw error: {error_msg}"
-            )
-        elif "timeout" in error_msg.lower():
-            diagnosis = (
-                f"AI recommendation failed: Request timed out ({error_type}).\n\n"
-                "The Anthropic API took too long to respond. This may be a temporary issue.\n\n"
-                f"Raw error: {error_msg}"
-            )
-        else:
-            diagnosis = f"AI recommendation failed: {error_type} — {error_msg}"
-
-        print(f"  [AI ERROR] {error_type}: {error_msg}")
+        return [_failure_result(e) for _ in pairs]
 
-        return {
-            "signal": "N/A",
-            "conviction": 0,
-            "recommendation": diagnosis,
-            "risk_factors": [],
-            "available": False,
-        }
+    return [
+        r if r is not None else _error_result("AI recommendation failed: no result returned for this pair.")
+        for r in results
+    ]
@@ -4,30 +4,94 @@ import numpy as np
 import pandas as pd
 import statsmodels.api as sm
 from statsmodels.tsa.stattools import coint, adfuller
+from cache import LRUCache, array_key
+from _njit import njit, types, NUMBA_AVAILABLE, F8_1D, F8_1D_RO
 from config import (
     RATIO_MA_SHORT, RATIO_MA_LONG, RATIO_ZSCORE_WINDOW,
     MOMENTUM_WINDOW, RELATIVE_RETURN_PERIODS,
     PERIOD_MA_WINDOWS, PERIOD_MOMENTUM_WINDOWS,
 )
 
+# Memoized results of the expensive pure functions below, keyed by a content
+# hash of the input arrays — re-analyzing the same pair skips the recompute.
+_COINT_CACHE = LRUCache(maxsize=128)
+_HURST_CACHE = LRUCache(maxsize=128)
+
+
+# ── Rolling-window helpers ───────────────────────────────────────────────────
+
+def _window_sums(x: np.ndarray, window: int) -> np.ndarray:
+    """Sum of every length-`window` slice of x (len(x) - window + 1 values), via one cumsum."""
+    c = np.cumsum(x)
+    return c[window - 1:] - np.concatenate(([0.0], c[:-window]))
+
+
+def _rolling_mean_std(x: np.ndarray, window: int, with_std: bool = True) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    Rolling mean and sample std (ddof=1) in O(n) from windowed sums.
+    Matches pandas rolling(window).mean()/.std(): the first window-1 slots and
+    any window containing a NaN are NaN.
+    """
+    mean = np.full(x.size, np.nan)
+    std = np.full(x.size, np.nan) if with_std else None
+    if window > x.size:
+        return mean, std
+
+    valid = ~np.isnan(x)
+    # Center on the overall mean so the sum of squares doesn't lose precision
+    shift = float(x[valid].mean()) if valid.any() else 0.0
+    filled = np.where(valid, x - shift, 0.0)
+    full = _window_sums(valid.astype(np.float64), window) == window
+    s1 = _window_sums(filled, window)
+    mean[window - 1:] = np.where(full, s1 / window + shift, np.nan)
+
+    if with_std:
+        s2 = _window_sums(filled * filled, window)
+        var = np.maximum(s2 - s1 * s1 / window, 0.0) / (window - 1)
+        std[window - 1:] = np.where(full, np.sqrt(var), np.nan)
+    return mean, std
+
+
+def _last_valid(values: pd.Series | np.ndarray, default=None):
+    """Last non-NaN value of a Series / array as a float, or `default` if there is none."""
+    arr = np.asarray(values, dtype=np.float64)
+    idx = np.flatnonzero(~np.isnan(arr))
+    return float(arr[idx[-1]]) if idx.size else default
+
 
 # ── Price Ratio ───────────────────────────────────────────────────────────────
 
-def compute_price_ratio(prices_a: pd.Series, prices_b: pd.Series) -> pd.Series:
+def compute_price_ratio_np(a: np.ndarray, b: np.ndarray) -> np.ndarray:
     """
     Price ratio = A / B.  A rising ratio means A is outperforming B.
     Guards against division by zero / inf.
     """
-    ratio = prices_a / prices_b
-    ratio = ratio.replace([np.inf, -np.inf], np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = a / b
+    ratio[np.isinf(ratio)] = np.nan
     return ratio
 
 
+def compute_price_ratio(prices_a: pd.Series, prices_b: pd.Series) -> pd.Series:
+    """Series wrapper around compute_price_ratio_np (aligns on the index, like a / b)."""
+    if not prices_a.index.equals(prices_b.index):
+        prices_a, prices_b = prices_a.align(prices_b)
+    ratio = compute_price_ratio_np(
+        prices_a.to_numpy(dtype=np.float64), prices_b.to_numpy(dtype=np.float64)
+    )
+    return pd.Series(ratio, index=prices_a.index)
+
+
 # ── Cumulative Returns ────────────────────────────────────────────────────────
 
-def compute_returns(prices: pd.Series) -> pd.Series:
+def compute_returns_np(prices: np.ndarray) -> np.ndarray:
     """Cumulative percentage return from the start of the series."""
-    return ((prices / prices.iloc[0]) - 1) * 100
+    return ((prices / prices[0]) - 1) * 100
+
+
+def compute_returns(prices: pd.Series) -> pd.Series:
+    """Series wrapper around compute_returns_np."""
+    return pd.Series(compute_returns_np(prices.to_numpy(dtype=np.float64)), index=prices.index)
 
 
 # ── Periodic Returns (daily or monthly bars) ─────────────────────────────
@@ -92,29 +156,40 @@ def compute_periodic_returns(
 
 # ── Relative Returns over Standard Periods ────────────────────────────────────
 
-def compute_relative_returns(prices_a: pd.Series, prices_b: pd.Series) -> dict:
+def compute_relative_returns_np(a: np.ndarray, b: np.ndarray) -> dict:
     """
     Compute return differentials over 1mo, 3mo, 6mo windows.
     Returns dict keyed by period label.
     """
-    result = {}
-    n = len(prices_a)
+    n = a.size
+
+    # Gather all usable lookback points at once
+    labels = [label for label, days in RELATIVE_RETURN_PERIODS.items() if n >= days + 1]
+    result = {label: {"return_a": None, "return_b": None, "differential": None}
+              for label in RELATIVE_RETURN_PERIODS}
+    if not labels:
+        return result
+
+    offsets = np.fromiter((RELATIVE_RETURN_PERIODS[label] for label in labels), dtype=np.int64)
+    ret_a = (a[-1] / a[-offsets] - 1) * 100
+    ret_b = (b[-1] / b[-offsets] - 1) * 100
+
+    for label, ra, rb, diff in zip(
+        labels,
+        np.round(ret_a, 2).tolist(),
+        np.round(ret_b, 2).tolist(),
+        np.round(ret_a - ret_b, 2).tolist(),
+    ):
+        result[label] = {"return_a": ra, "return_b": rb, "differential": diff}
 
-    for label, days in RELATIVE_RETURN_PERIODS.items():
-        if n < days + 1:
-            result[label] = {"return_a": None, "return_b": None, "differential": None}
-            continue
+    return result
 
-        ret_a = float((prices_a.iloc[-1] / prices_a.iloc[-days] - 1) * 100)
-        ret_b = float((prices_b.iloc[-1] / prices_b.iloc[-days] - 1) * 100)
 
-        result[label] = {
-            "return_a":     round(ret_a, 2),
-            "return_b":     round(ret_b, 2),
-            "differential": round(ret_a - ret_b, 2),
-        }
-
-    return result
+def compute_relative_returns(prices_a: pd.Series, prices_b: pd.Series) -> dict:
+    """Series wrapper around compute_relative_returns_np."""
+    return compute_relative_returns_np(
+        prices_a.to_numpy(dtype=np.float64), prices_b.to_numpy(dtype=np.float64)
+    )
 
 
 # ── Ratio Momentum (Rate of Change) ──────────────────────────────────────────
@@ -127,13 +202,18 @@ def compute_ratio_momentum(ratio: pd.Series, window: int = MOMENTUM_WINDOW) -> d
     roc = ((ratio / ratio.shift(window)) - 1) * 100
     roc = roc.replace([np.inf, -np.inf], np.nan)
 
-    current_roc = float(roc.dropna().iloc[-1]) if len(roc.dropna()) > 0 else 0.0
+    current_roc = _last_valid(roc.to_numpy(dtype=np.float64))
+    if current_roc is None:
+        current_roc = 0.0
 
     # Slope via linear regression on last `window` data points
-    recent = ratio.dropna().values[-window:] if len(ratio.dropna()) >= window else ratio.dropna().values
-    if len(recent) >= 5:
-        x = np.arange(len(recent))
-        slope = float(np.polyfit(x, recent, 1)[0])
+    values = ratio.to_numpy(dtype=np.float64)
+    recent = values[~np.isnan(values)][-window:]
+    if recent.size >= 5:
+        # Closed-form OLS slope: cov(x, y) / var(x) with x = 0..n-1
+        n = recent.size
+        x_dev = np.arange(n) - (n - 1) / 2
+        slope = float((x_dev * (recent - recent.mean())).sum() / (n * (n * n - 1) / 12))
     else:
         slope = 0.0
 
@@ -155,20 +235,20 @@ def compute_ratio_ma(ratio: pd.Series, short: int = RATIO_MA_SHORT, long: int =
     Windows are adaptive based on period (default: 50/200d for 1y+).
     Returns series + current values + above/below flags.
     """
-    ma_short = ratio.rolling(window=short).mean()
-    ma_long  = ratio.rolling(window=long).mean()
+    values = ratio.to_numpy(dtype=np.float64)
+    ma_short, _ = _rolling_mean_std(values, short, with_std=False)
+    ma_long, _  = _rolling_mean_std(values, long, with_std=False)
 
-    current_ratio = float(ratio.dropna().iloc[-1]) if len(ratio.dropna()) > 0 else None
-
-    cur_short = float(ma_short.dropna().iloc[-1]) if len(ma_short.dropna()) > 0 else None
-    cur_long  = float(ma_long.dropna().iloc[-1])  if len(ma_long.dropna()) > 0 else None
+    current_ratio = _last_valid(values)
+    cur_short = _last_valid(ma_short)
+    cur_long  = _last_valid(ma_long)
 
     above_short = bool(current_ratio > cur_short) if (current_ratio is not None and cur_short is not None) else None
     above_long  = bool(current_ratio > cur_long)  if (current_ratio is not None and cur_long is not None) else None
 
     return {
-        "ma_short_series": ma_short,
-        "ma_long_series":  ma_long,
+        "ma_short_series": pd.Series(ma_short, index=ratio.index),
+        "ma_long_series":  pd.Series(ma_long, index=ratio.index),
         "current_ratio":   round(current_ratio, 4) if current_ratio else None,
         "ma_short":        round(cur_short, 4) if cur_short else None,
         "ma_long":         round(cur_long, 4) if cur_long else None,
@@ -181,17 +261,35 @@ def compute_ratio_ma(ratio: pd.Series, short: int = RATIO_MA_SHORT, long: int =
 
 def compute_zscore(series: pd.Series, window: int = RATIO_ZSCORE_WINDOW) -> pd.Series:
     """Rolling z-score: (value - rolling_mean) / rolling_std."""
-    rolling_mean = series.rolling(window=window).mean()
-    rolling_std  = series.rolling(window=window).std()
-    return (series - rolling_mean) / rolling_std
+    values = series.to_numpy(dtype=np.float64)
+    rolling_mean, rolling_std = _rolling_mean_std(values, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        zscore = (values - rolling_mean) / rolling_std
+    return pd.Series(zscore, index=series.index)
 
 
 # ── Cointegration ────────────────────────────────────────────────────────────
 
+def cointegration_test_np(a: np.ndarray, b: np.ndarray) -> dict:
+    """Engle-Granger two-step cointegration test (memoized on price contents)."""
+    key = array_key(a, b)
+    cached = _COINT_CACHE.get(key)
+    if cached is None:
+        cached = _cointegration_test(a, b)
+        _COINT_CACHE.put(key, cached)
+    return dict(cached)
+
+
 def cointegration_test(prices_a: pd.Series, prices_b: pd.Series) -> dict:
-    """Engle-Granger two-step cointegration test."""
+    """Series wrapper around cointegration_test_np."""
+    return cointegration_test_np(
+        prices_a.to_numpy(dtype=np.float64), prices_b.to_numpy(dtype=np.float64)
+    )
+
+
+def _cointegration_test(a: np.ndarray, b: np.ndarray) -> dict:
     try:
-        stat, pvalue, crit = coint(prices_a.values, prices_b.values)
+        stat, pvalue, crit = coint(a, b)
         return {
             "test_stat":       round(float(stat), 4),
             "p_value":         round(float(pvalue), 4),
@@ -210,16 +308,54 @@ def cointegration_test(prices_a: pd.Series, prices_b: pd.Series) -> dict:
 
 # ── Correlation ──────────────────────────────────────────────────────────────
 
-def compute_correlation(prices_a: pd.Series, prices_b: pd.Series) -> dict:
-    """Pearson correlation and rolling 60-day correlation."""
-    corr = float(prices_a.corr(prices_b))
-    rolling_corr = prices_a.rolling(60).corr(prices_b)
+def compute_correlation_np(
+    a: np.ndarray, b: np.ndarray, window: int = 60, with_rolling: bool = True
+) -> dict:
+    """
+    Pearson correlation and rolling 60-day correlation.
+    The rolling series is closed-form from windowed sums of a, b, a·b, a², b²;
+    it is skipped (rolling_60d = None) when with_rolling is False.
+    """
+    both = ~(np.isnan(a) | np.isnan(b))
+    corr = float(np.corrcoef(a[both], b[both])[0, 1]) if both.sum() > 1 else float("nan")
+    if not with_rolling:
+        return {"pearson": round(corr, 4), "rolling_60d": None}
+
+    rolling_corr = np.full(a.size, np.nan)
+    if a.size >= window:
+        # Correlation is shift-invariant — centering keeps the sums well conditioned.
+        # Pairs with a NaN on either side are zeroed and their windows blanked.
+        if both.any():
+            a = np.where(both, a - a[both].mean(), 0.0)
+            b = np.where(both, b - b[both].mean(), 0.0)
+        full = _window_sums(both.astype(np.float64), window) == window
+        sa, sb = _window_sums(a, window), _window_sums(b, window)
+        cov   = _window_sums(a * b, window) - sa * sb / window
+        var_a = _window_sums(a * a, window) - sa * sa / window
+        var_b = _window_sums(b * b, window) - sb * sb / window
+        denom = var_a * var_b
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rolling_corr[window - 1:] = np.where(full & (denom > 0), cov / np.sqrt(denom), np.nan)
+
+    rounded = np.round(rolling_corr, 4)
     return {
         "pearson":        round(corr, 4),
-        "rolling_60d":    [round(float(v), 4) if not np.isnan(v) else None for v in rolling_corr],
+        "rolling_60d":    np.where(np.isnan(rounded), None, rounded).tolist(),
     }
 
 
+def compute_correlation(
+    prices_a: pd.Series, prices_b: pd.Series, window: int = 60, with_rolling: bool = True
+) -> dict:
+    """Series wrapper around compute_correlation_np (aligns on the index first)."""
+    if not prices_a.index.equals(prices_b.index):
+        prices_a, prices_b = prices_a.align(prices_b)
+    return compute_correlation_np(
+        prices_a.to_numpy(dtype=np.float64), prices_b.to_numpy(dtype=np.float64),
+        window=window, with_rolling=with_rolling,
+    )
+
+
 # ── Spread Stability (ADF on ratio) ──────────────────────────────────────────
 
 def adf_test(series: pd.Series) -> dict:
@@ -237,6 +373,80 @@ def adf_test(series: pd.Series) -> dict:
 
 # ── Hurst Exponent ───────────────────────────────────────────────────────────
 
+# Explicit signatures → compiled eagerly at import (or loaded from the on-disk
+# cache) instead of stalling the first request that needs it. Without numba
+# the kernel runs as plain Python.
+_HURST_SIGNATURES = (
+    [types.float64(F8_1D, types.int64), types.float64(F8_1D_RO, types.int64)]
+    if NUMBA_AVAILABLE else None
+)
+
+
+@njit(_HURST_SIGNATURES, cache=True, fastmath=True)
+def _hurst_rs_kernel(ts: np.ndarray, max_k: int) -> float:
+    """
+    R/S regression slope for lags 2..max_k-1 (NaN if fewer than 5 usable lags).
+    Range and std of each sub-window are accumulated in a single pass.
+    """
+    n = ts.shape[0]
+    log_lags = np.empty(max_k)
+    log_rs = np.empty(max_k)
+    m = 0
+
+    for lag in range(2, max_k):
+        n_subseries = n // lag
+        rs_sum = 0.0
+        rs_count = 0
+        for i in range(n_subseries):
+            start = i * lag
+            mean_sub = 0.0
+            for j in range(lag):
+                mean_sub += ts[start + j]
+            mean_sub /= lag
+
+            # Running sum of deviations → range R; sum of squares → std S
+            d = ts[start] - mean_sub
+            cum = d
+            cmax = cum
+            cmin = cum
+            sum_sq = d * d
+            for j in range(1, lag):
+                d = ts[start + j] - mean_sub
+                cum += d
+                if cum > cmax:
+                    cmax = cum
+                if cum < cmin:
+                    cmin = cum
+                sum_sq += d * d
+            s = np.sqrt(sum_sq / (lag - 1))
+            if s > 0:
+                rs_sum += (cmax - cmin) / s
+                rs_count += 1
+        if rs_count > 0:
+            log_lags[m] = np.log(lag)
+            log_rs[m] = np.log(rs_sum / rs_count)
+            m += 1
+
+    if m < 5:
+        return np.nan
+
+    # OLS slope of log(R/S) on log(lag)
+    x_mean = 0.0
+    y_mean = 0.0
+    for i in range(m):
+        x_mean += log_lags[i]
+        y_mean += log_rs[i]
+    x_mean /= m
+    y_mean /= m
+    cov = 0.0
+    var = 0.0
+    for i in range(m):
+        dx = log_lags[i] - x_mean
+        cov += dx * (log_rs[i] - y_mean)
+        var += dx * dx
+    return cov / var
+
+
 def hurst_exponent(series: pd.Series) -> float:
     """
     Estimate Hurst exponent via R/S (rescaled range) method.
@@ -248,35 +458,70 @@ def hurst_exponent(series: pd.Series) -> float:
     if n < 20:
         return float("nan")
 
+    key = array_key(ts)
+    cached = _HURST_CACHE.get(key)
+    if cached is not None:
+        return cached
+
     max_k = min(n // 2, 100)
-    lags = range(2, max_k)
-    rs_values = []
+    slope = _hurst_rs_kernel(np.ascontiguousarray(ts, dtype=np.float64), max_k)
+    result = float("nan") if np.isnan(slope) else round(float(slope), 4)
+    _HURST_CACHE.put(key, result)
+    return result
 
-    for lag in lags:
-        n_subseries = n // lag
-        if n_subseries < 1:
-            break
-        rs_list = []
-        for i in range(n_subseries):
-            sub = ts[i * lag : (i + 1) * lag]
-            mean_sub = np.mean(sub)
-            deviations = np.cumsum(sub - mean_sub)
-            r = np.max(deviations) - np.min(deviations)
-            s = np.std(sub, ddof=1)
-            if s > 0:
-                rs_list.append(r / s)
-        if rs_list:
-            rs_values.append((np.log(lag), np.log(np.mean(rs_list))))
 
-    if len(rs_values) < 5:
-        return float("nan")
+# ── Signal Generation ────────────────────────────────────────────────────────
 
-    log_lags, log_rs = zip(*rs_values)
-    poly = np.polyfit(log_lags, log_rs, 1)
-    return round(float(poly[0]), 4)
+def _signal_details(
+    above_short: bool | None,
+    above_long: bool | None,
+    mom_dir: str,
+    rsi_val: float | None,
+    macd_hist: float | None,
+    current_z: float,
+) -> list[str]:
+    """Human-readable reasons behind the score computed in generate_signals()."""
+    details = []
 
+    if above_short is True:
+        details.append(f"Ratio above {RATIO_MA_SHORT}d MA")
+    elif above_short is False:
+        details.append(f"Ratio below {RATIO_MA_SHORT}d MA")
+
+    if above_long is True:
+        details.append(f"Ratio above {RATIO_MA_LONG}d MA")
+    elif above_long is False:
+        details.append(f"Ratio below {RATIO_MA_LONG}d MA")
+
+    if mom_dir == "UP":
+        details.append("Momentum positive (ratio rising)")
+    elif mom_dir == "DOWN":
+        details.append("Momentum negative (ratio falling)")
+
+    if rsi_val is not None:
+        if rsi_val > 60:
+            details.append(f"RSI strong at {rsi_val:.0f} (favors A)")
+        elif rsi_val < 40:
+            details.append(f"RSI weak at {rsi_val:.0f} (favors B)")
+        elif rsi_val > 50:
+            details.append(f"RSI leaning bullish ({rsi_val:.0f})")
+        else:
+            details.append(f"RSI leaning bearish ({rsi_val:.0f})")
+
+    if macd_hist is not None:
+        if macd_hist > 0:
+            details.append("MACD positive (A momentum)")
+        elif macd_hist < 0:
+            details.append("MACD negative (B momentum)")
+
+    # Z-score extremes (informational, not scored)
+    if current_z > 1.5:
+        details.append("Ratio z-score elevated — A may be extended")
+    elif current_z < -1.5:
+        details.append("Ratio z-score depressed — B may be extended")
+
+    return details
 
-# ── Signal Generation ────────────────────────────────────────────────────────
 
 def generate_signals(
     zscore: pd.Series,
@@ -301,105 +546,62 @@ def generate_signals(
 
     Returns signal direction, strength, and summary.
     """
-    current_z = float(zscore.dropna().iloc[-1]) if len(zscore.dropna()) > 0 else 0.0
+    current_z = _last_valid(zscore.to_numpy(dtype=np.float64))
+    if current_z is None:
+        current_z = 0.0
     mom_dir   = momentum.get("direction", "FLAT")
     above_short = ma_info.get("above_ma_short")
     above_long  = ma_info.get("above_ma_long")
 
     tech = tech_confirmation or {}
+    rsi_val   = tech.get("rsi_value")
+    macd_hist = tech.get("macd_hist")
 
-    # Count signals favoring A vs B
-    favor_a_count = 0
-    favor_b_count = 0
-    details = []
-
-    # 1. MA position signals
-    if above_short is True:
-        favor_a_count += 1
-        details.append(f"Ratio above {RATIO_MA_SHORT}d MA")
-    elif above_short is False:
-        favor_b_count += 1
-        details.append(f"Ratio below {RATIO_MA_SHORT}d MA")
-
-    if above_long is True:
-        favor_a_count += 1
-        details.append(f"Ratio above {RATIO_MA_LONG}d MA")
-    elif above_long is False:
-        favor_b_count += 1
-        details.append(f"Ratio below {RATIO_MA_LONG}d MA")
-
-    # 2. Momentum
-    if mom_dir == "UP":
-        favor_a_count += 1
-        details.append("Momentum positive (ratio rising)")
-    elif mom_dir == "DOWN":
-        favor_b_count += 1
-        details.append("Momentum negative (ratio falling)")
+    # Integer scores in half-points: a full signal counts 2, an RSI lean counts 1
+    score_a = 2 * (above_short is True) + 2 * (above_long is True) + 2 * (mom_dir == "UP")
+    score_b = 2 * (above_short is False) + 2 * (above_long is False) + 2 * (mom_dir == "DOWN")
 
-    # 3. RSI on ratio
-    rsi_val = tech.get("rsi_value")
     if rsi_val is not None:
         if rsi_val > 60:
-            favor_a_count += 1
-            details.append(f"RSI strong at {rsi_val:.0f} (favors A)")
+            score_a += 2
         elif rsi_val < 40:
-            favor_b_count += 1
-            details.append(f"RSI weak at {rsi_val:.0f} (favors B)")
+            score_b += 2
         elif rsi_val > 50:
-            favor_a_count += 0.5
-            details.append(f"RSI leaning bullish ({rsi_val:.0f})")
+            score_a += 1
         else:
-            favor_b_count += 0.5
-            details.append(f"RSI leaning bearish ({rsi_val:.0f})")
+            score_b += 1
 
-    # 4. MACD histogram on ratio
-    macd_hist = tech.get("macd_hist")
     if macd_hist is not None:
-        if macd_hist > 0:
-            favor_a_count += 1
-            details.append("MACD positive (A momentum)")
-        elif macd_hist < 0:
-            favor_b_count += 1
-            details.append("MACD negative (B momentum)")
-
-    # Z-score extremes (informational, not scored)
-    if current_z > 1.5:
-        details.append("Ratio z-score elevated — A may be extended")
-    elif current_z < -1.5:
-        details.append("Ratio z-score depressed — B may be extended")
+        score_a += 2 * (macd_hist > 0)
+        score_b += 2 * (macd_hist < 0)
 
-    # Determine direction — need majority of scored inputs
-    total_inputs = favor_a_count + favor_b_count
+    # Determine direction — the leading side needs 2+ signals (3+ = strong)
     max_possible = 5  # 2 MAs + momentum + RSI + MACD
-
-    if favor_a_count >= 3 and favor_a_count > favor_b_count:
+    if score_a > score_b and score_a >= 4:
         direction = "FAVOR_A"
-        strength = min(favor_a_count / max_possible, 1.0)
-        detail = "A is outperforming B — " + "; ".join(details)
-    elif favor_b_count >= 3 and favor_b_count > favor_a_count:
+        lead = score_a
+        headline = "A is outperforming B" if score_a >= 6 else "A slightly outperforming B"
+    elif score_b > score_a and score_b >= 4:
         direction = "FAVOR_B"
-        strength = min(favor_b_count / max_possible, 1.0)
-        detail = "B is outperforming A — " + "; ".join(details)
-    elif favor_a_count >= 2 and favor_a_count > favor_b_count:
-        direction = "FAVOR_A"
-        strength = min(favor_a_count / max_possible, 1.0)
-        detail = "A slightly outperforming B — " + "; ".join(details)
-    elif favor_b_count >= 2 and favor_b_count > favor_a_count:
-        direction = "FAVOR_B"
-        strength = min(favor_b_count / max_possible, 1.0)
-        detail = "B slightly outperforming A — " + "; ".join(details)
+        lead = score_b
+        headline = "B is outperforming A" if score_b >= 6 else "B slightly outperforming A"
     else:
         direction = "NEUTRAL"
-        strength = 0.0
-        detail = "No clear outperformance trend — " + "; ".join(details) if details else "Insufficient data for signal"
+        lead = 0
+        headline = "No clear outperformance trend"
+    strength = min(lead / (2 * max_possible), 1.0)
+
+    details = _signal_details(above_short, above_long, mom_dir, rsi_val, macd_hist, current_z)
+    detail = headline + " — " + "; ".join(details) if details else "Insufficient data for signal"
 
     return {
         "direction":       direction,
         "current_zscore":  round(current_z, 4),
         "strength":        round(float(strength), 2),
         "detail":          detail,
-        "favor_a_count":   round(favor_a_count, 1),
-        "favor_b_count":   round(favor_b_count, 1),
+        # Whole counts stay ints; only an RSI lean makes a half-point float
+        "favor_a_count":   score_a // 2 if score_a % 2 == 0 else score_a / 2,
+        "favor_b_count":   score_b // 2 if score_b % 2 == 0 else score_b / 2,
     }
 
 
@@ -410,6 +612,7 @@ def run_full_analysis(
     prices_b: pd.Series,
     tech_confirmation: dict | None = None,
     period: str = "1y",
+    want_series: bool = True,
 ) -> dict:
     """
     Run the complete relative performance analysis pipeline.
@@ -420,6 +623,10 @@ def run_full_analysis(
     tech_confirmation  : optional dict from technical_confirmation()
                          (RSI, MACD, BB on the ratio) — fed into signal generation
     period             : lookback period key — used to select adaptive MA/momentum windows
+    want_series        : build the per-date chart series (ratio, z-score, returns,
+                         rolling correlation). When False those blocks are None and
+                         only "statistics" and "signal" are populated — for callers
+                         that sweep many pairs and never chart them.
     """
 
     # Adaptive windows based on period (short periods need shorter MAs)
@@ -427,8 +634,13 @@ def run_full_analysis(
     mom_w = PERIOD_MOMENTUM_WINDOWS.get(period, MOMENTUM_WINDOW)
     zscore_w = min(RATIO_ZSCORE_WINDOW, max(5, len(prices_a) // 4))
 
+    # Materialize the prices as float64 arrays once; helpers below work on these
+    a = prices_a.to_numpy(dtype=np.float64, copy=False)
+    b = prices_b.to_numpy(dtype=np.float64, copy=False)
+    idx = prices_a.index
+
     # 1. Price ratio
-    ratio = compute_price_ratio(prices_a, prices_b)
+    ratio = pd.Series(compute_price_ratio_np(a, b), index=idx)
 
     # 2. Moving averages on ratio (adaptive windows)
     ma_info = compute_ratio_ma(ratio, short=ma_short_w, long=ma_long_w)
@@ -439,69 +651,84 @@ def run_full_analysis(
     # 4. Momentum (adaptive window)
     momentum = compute_ratio_momentum(ratio, window=mom_w)
 
-    # 5. Cumulative returns
-    returns_a = compute_returns(prices_a)
-    returns_b = compute_returns(prices_b)
-
-    # 5b. Periodic returns (daily or monthly bars)
-    periodic = compute_periodic_returns(prices_a, prices_b, period)
-
-    # 6. Relative returns (1mo, 3mo, 6mo)
-    rel_returns = compute_relative_returns(prices_a, prices_b)
+    # 5. Relative returns (1mo, 3mo, 6mo)
+    rel_returns = compute_relative_returns_np(a, b)
 
-    # 7. Correlation
-    corr = compute_correlation(prices_a, prices_b)
+    # 6. Correlation (rolling series only needed for charting)
+    corr = compute_correlation_np(a, b, with_rolling=want_series)
 
-    # 8. ADF on ratio (is ratio stationary or trending?)
+    # 7. ADF on ratio (is ratio stationary or trending?)
     adf = adf_test(ratio)
 
-    # 9. Hurst on ratio
+    # 8. Hurst on ratio
     hurst = hurst_exponent(ratio)
 
-    # 10. Cointegration (still useful context)
-    coint_result = cointegration_test(prices_a, prices_b)
+    # 9. Cointegration (still useful context)
+    coint_result = cointegration_test_np(a, b)
 
-    # 11. Signals (now includes RSI + MACD from technicals)
+    # 10. Signals (now includes RSI + MACD from technicals)
     signals = generate_signals(zscore, momentum, ma_info, tech_confirmation)
 
-    # Serialize for charting
-    dates = [d.strftime("%Y-%m-%d") for d in ratio.index]
+    statistics = {
+        "current_ratio":      ma_info["current_ratio"],
+        "ratio_ma_short":     ma_info["ma_short"],
+        "ratio_ma_long":      ma_info["ma_long"],
+        "ratio_above_ma_short": ma_info["above_ma_short"],
+        "ratio_above_ma_long":  ma_info["above_ma_long"],
+        # Legacy aliases for backward compat with frontend
+        "ratio_ma_50":        ma_info["ma_short"],
+        "ratio_ma_200":       ma_info["ma_long"],
+        "ratio_above_ma_50":  ma_info["above_ma_short"],
+        "ratio_above_ma_200": ma_info["above_ma_long"],
+        "ma_short_window":    ma_short_w,
+        "ma_long_window":     ma_long_w,
+        "momentum_roc":       momentum["current_roc"],
+        "momentum_direction": momentum["direction"],
+        "relative_returns":   rel_returns,
+        "correlation":        corr["pearson"],
+        "hurst_exponent":     hurst,
+        "adf_pvalue":         adf["adf_pvalue"],
+        "is_stationary":      adf["is_stationary"],
+        "current_zscore":     signals["current_zscore"],
+        "cointegration":      coint_result,
+    }
 
-    def _safe_list(s):
-        return [round(float(v), 4) if not np.isnan(v) else None for v in s]
+    if not want_series:
+        return {
+            "statistics":          statistics,
+            "ratio":               None,
+            "zscore":              None,
+            "returns":             None,
+            "correlation_rolling": None,
+            "signal":              signals,
+        }
 
-    ratio_vals   = _safe_list(ratio)
-    zscore_vals  = _safe_list(zscore)
-    ma_short_vals = _safe_list(ma_info["ma_short_series"])
-    ma_long_vals  = _safe_list(ma_info["ma_long_series"])
-    returns_a_vals = _safe_list(returns_a)
-    returns_b_vals = _safe_list(returns_b)
+    # 11. Cumulative returns
+    returns_a = compute_returns_np(a)
+    returns_b = compute_returns_np(b)
+
+    # 12. Periodic returns (daily or monthly bars)
+    periodic = compute_periodic_returns(prices_a, prices_b, period)
+
+    # Serialize for charting — round and NaN → None for all six series in one pass
+    dates = ratio.index.strftime("%Y-%m-%d").tolist()
+
+    stacked = np.column_stack([
+        ratio.to_numpy(dtype=np.float64),
+        zscore.to_numpy(dtype=np.float64),
+        ma_info["ma_short_series"].to_numpy(dtype=np.float64),
+        ma_info["ma_long_series"].to_numpy(dtype=np.float64),
+        returns_a,
+        returns_b,
+    ])
+    rounded = np.round(stacked, 4).astype(object)
+    rounded[np.isnan(stacked)] = None
+    (ratio_vals, zscore_vals, ma_short_vals, ma_long_vals,
+     returns_a_vals, returns_b_vals) = rounded.T.tolist()
     corr_rolling = corr.pop("rolling_60d")
 
     return {
-        "statistics": {
-            "current_ratio":      ma_info["current_ratio"],
-            "ratio_ma_short":     ma_info["ma_short"],
-            "ratio_ma_long":      ma_info["ma_long"],
-            "ratio_above_ma_short": ma_info["above_ma_short"],
-            "ratio_above_ma_long":  ma_info["above_ma_long"],
-            # Legacy aliases for backward compat with frontend
-            "ratio_ma_50":        ma_info["ma_short"],
-            "ratio_ma_200":       ma_info["ma_long"],
-            "ratio_above_ma_50":  ma_info["above_ma_short"],
-            "ratio_above_ma_200": ma_info["above_ma_long"],
-            "ma_short_window":    ma_short_w,
-            "ma_long_window":     ma_long_w,
-            "momentum_roc":       momentum["current_roc"],
-            "momentum_direction": momentum["direction"],
-            "relative_returns":   rel_returns,
-            "correlation":        corr["pearson"],
-            "hurst_exponent":     hurst,
-            "adf_pvalue":         adf["adf_pvalue"],
-            "is_stationary":      adf["is_stationary"],
-            "current_zscore":     signals["current_zscore"],
-            "cointegration":      coint_result,
-        },
+        "statistics": statistics,
         "ratio": {
             "dates":  dates,
             "values": ratio_vals,
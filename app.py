@@ -12,8 +12,15 @@ from pydantic import BaseModel
 
 import uvicorn
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from config import HOST, PORT, LOOKBACK_OPTIONS
-from market_data import fetch_pair_data, validate_ticker, get_price_series, search_tickers
+from market_data import (
+    fetch_history, align_pair, validate_ticker, get_price_series, search_tickers, ticker_name,
+)
 from analysis import run_full_analysis, compute_price_ratio
 from technical import compute_all_technicals, compute_individual_rsi
 from ai_signal import get_ai_recommendation
@@ -33,6 +40,7 @@ class AnalyzeRequest(BaseModel):
     ticker_a: str
     ticker_b: str
     period: str = "1y"
+    charts: bool = True   # False → statistics/signals only, no per-date chart series
 
 
 # ── Routes ───────────────────────────────────────────────────────────────────
@@ -56,10 +64,14 @@ async def api_analyze(body: AnalyzeRequest):
     3. Compute technical indicators on the price ratio
     4. Get AI recommendation from Claude
     5. Return comprehensive JSON
+
+    With "charts": false in the body, the per-date chart series are skipped
+    (returned as null); statistics, signals and conviction are unchanged.
     """
     ticker_a = body.ticker_a.strip().upper()
     ticker_b = body.ticker_b.strip().upper()
     period   = body.period if body.period in LOOKBACK_OPTIONS else "1y"
+    charts   = body.charts
 
     if not ticker_a or not ticker_b:
         return JSONResponse({"error": "Both tickers are required."}, status_code=400)
@@ -72,10 +84,29 @@ async def api_analyze(body: AnalyzeRequest):
         swapped = ticker_a > ticker_b
         canon_a, canon_b = (ticker_b, ticker_a) if swapped else (ticker_a, ticker_b)
 
-        # 1. Fetch price data (run in thread to not block event loop)
-        result = await asyncio.to_thread(fetch_pair_data, canon_a, canon_b, period)
-
-        # fetch_pair_data returns (None, error_string) on failure
+        # 1. Fetch history + chart data (or just names) for both tickers
+        #    concurrently, each in a worker thread so the event loop isn't
+        #    blocked. get_price_series reuses the cached history, so each
+        #    ticker is downloaded once.
+        if charts:
+            info_a = asyncio.to_thread(get_price_series, canon_a, period)
+            info_b = asyncio.to_thread(get_price_series, canon_b, period)
+        else:
+            info_a = asyncio.to_thread(_ticker_header, canon_a)
+            info_b = asyncio.to_thread(_ticker_header, canon_b)
+        try:
+            hist_a, hist_b, chart_a, chart_b = await asyncio.gather(
+                asyncio.to_thread(fetch_history, canon_a, period),
+                asyncio.to_thread(fetch_history, canon_b, period),
+                info_a,
+                info_b,
+            )
+        except Exception as e:
+            print(f"  Error fetching pair data ({canon_a}, {canon_b}): {e}")
+            return JSONResponse({"error": f"Error fetching data: {e}"}, status_code=400)
+
+        # align_pair returns (None, error_string) on failure
+        result = align_pair(hist_a, hist_b, canon_a, canon_b, period)
         if result[0] is None:
             error_msg = result[1] if len(result) > 1 else "Unknown error fetching data."
             return JSONResponse({"error": error_msg}, status_code=400)
@@ -84,22 +115,20 @@ async def api_analyze(body: AnalyzeRequest):
         prices_a = df_a["close"]
         prices_b = df_b["close"]
 
-        # Also fetch full chart data for individual price charts
-        chart_a = await asyncio.to_thread(get_price_series, canon_a, period)
-        chart_b = await asyncio.to_thread(get_price_series, canon_b, period)
-
-        # 2. Technical indicators on the price ratio (computed first so we can feed into signals)
+        # 2. Technical indicators on the price ratio (computed first so we can feed into
+        #    signals), alongside the individual RSIs for comparison — independent work,
+        #    so both run concurrently in worker threads.
         ratio_series = compute_price_ratio(prices_a, prices_b)
-        technicals = await asyncio.to_thread(compute_all_technicals, ratio_series)
+        technicals, individual_rsi = await asyncio.gather(
+            asyncio.to_thread(compute_all_technicals, ratio_series, charts),
+            asyncio.to_thread(compute_individual_rsi, prices_a, prices_b, charts),
+        )
 
         # 3. Statistical analysis (ratio-based) — now includes tech confirmation in signal
         analysis = await asyncio.to_thread(
-            run_full_analysis, prices_a, prices_b, technicals.get("confirmation"), period
+            run_full_analysis, prices_a, prices_b, technicals.get("confirmation"), period, charts
         )
 
-        # 3b. Individual RSI for comparison
-        individual_rsi = await asyncio.to_thread(compute_individual_rsi, prices_a, prices_b)
-
         # 4. AI recommendation (pass canonical order)
         ai_rec = await get_ai_recommendation(
             canon_a, canon_b,
@@ -120,7 +149,7 @@ async def api_analyze(body: AnalyzeRequest):
             combined_conviction = _flip_combined(combined_conviction)
             chart_a, chart_b = chart_b, chart_a
 
-        payload = _sanitize({
+        payload = {
             "ticker_a": chart_a or {"symbol": ticker_a, "name": ticker_a, "dates": [], "prices": []},
             "ticker_b": chart_b or {"symbol": ticker_b, "name": ticker_b, "dates": [], "prices": []},
             "statistics":          analysis["statistics"],
@@ -133,9 +162,9 @@ async def api_analyze(body: AnalyzeRequest):
             "signal":              analysis["signal"],
             "ai_recommendation":   ai_rec,
             "combined":            combined_conviction,
-        })
+        }
 
-        return JSONResponse(payload)
+        return FastJSONResponse(payload)
 
     except Exception as e:
         print(f"  Analysis error ({ticker_a} / {ticker_b}): {e}")
@@ -163,6 +192,11 @@ async def api_search(q: str = ""):
     return JSONResponse({"results": results})
 
 
+def _ticker_header(ticker: str) -> dict:
+    """Symbol + name only — stands in for get_price_series when charts are off."""
+    return {"symbol": ticker, "name": ticker_name(ticker), "dates": None, "prices": None}
+
+
 # ── Canonical-order flip helpers ──────────────────────────────────────────────
 # When the user's input order (A, B) differs from canonical (alphabetical) order,
 # we flip all direction labels so the UI shows the correct ticker as favored.
@@ -205,11 +239,12 @@ def _flip_analysis(analysis: dict) -> dict:
     st["relative_returns"] = flipped_rr
     a["statistics"] = st
 
-    # returns chart data
-    ret = {**a["returns"]}
-    ret["returns_a"], ret["returns_b"] = ret["returns_b"], ret["returns_a"]
-    ret["periodic_a"], ret["periodic_b"] = ret["periodic_b"], ret["periodic_a"]
-    a["returns"] = ret
+    # returns chart data (None when analysis ran with want_series=False)
+    if a.get("returns") is not None:
+        ret = {**a["returns"]}
+        ret["returns_a"], ret["returns_b"] = ret["returns_b"], ret["returns_a"]
+        ret["periodic_a"], ret["periodic_b"] = ret["periodic_b"], ret["periodic_a"]
+        a["returns"] = ret
 
     return a
 
@@ -246,6 +281,19 @@ def _flip_combined(combined: dict) -> dict:
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse serialized by orjson: NaN / Inf / -Inf become null and numpy
+    values are accepted, with no Python-level walk of the payload.
+    Falls back to _sanitize + stdlib json when orjson isn't installed.
+    """
+
+    def render(self, content) -> bytes:
+        if orjson is None:
+            return super().render(_sanitize(content))
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
 def _sanitize(obj):
     """Recursively replace NaN / Inf / -Inf with None so JSONResponse won't crash."""
     if isinstance(obj, float):
@@ -289,117 +337,107 @@ def _compute_conviction(analysis: dict, technicals: dict, ai_rec: dict, period:
     ai_signal   = ai_rec.get("signal", "N/A")
     ai_conv     = ai_rec.get("conviction", 0)  # now 0-100
 
-    stats = analysis["statistics"]
+    # Inputs, read once
+    stats      = analysis["statistics"]
+    ratio_val  = stats.get("current_ratio")
+    ma_50_val  = stats.get("ratio_ma_50")
+    ma_200_val = stats.get("ratio_ma_200")
+    mom_dir    = stats.get("momentum_direction")
+    mom_roc    = stats.get("momentum_roc")
+    rsi_val    = tech_conf.get("rsi_value")
+    macd_hist  = tech_conf.get("macd_hist")
+    fa         = tech_conf.get("favors_a_count", 0)
+    fb         = tech_conf.get("favors_b_count", 0)
+
+    # Return differential: first available of 1mo / 3mo / 6mo
+    rel_ret = stats.get("relative_returns", {})
+    best_diff = None
+    for ret_period in ["1mo", "3mo", "6mo"]:
+        d = rel_ret.get(ret_period, {}).get("differential")
+        if d is not None:
+            best_diff = d
+            break
+
+    # RSI needs ~14 bars to stabilize — downweight it for short periods (30d/60d)
+    rsi_weight = 0.3 if period in ("30d", "60d") else 1.0
+
+    # Direction-independent criteria, scored once
+    # 8. Correlation (0-10): higher abs correlation = more meaningful pair
+    corr = stats.get("correlation", 0) or 0
+    corr_score = min(10, abs(corr) * 10)
+    # 9. Hurst exponent (0-10): >0.5 = trending
+    hurst = stats.get("hurst_exponent")
+    if hurst is None:
+        hurst_score = 0
+    elif hurst > 0.5:
+        hurst_score = min(10, (hurst - 0.5) * 20)  # 0.5→0, 0.6→2, 0.75→5, 1.0→10
+    else:
+        hurst_score = max(0, hurst * 4)  # some credit for near-0.5
 
     def _score_for_direction(favor_a: bool):
         """Score 10 criteria (0-10 each, 100 max) from one direction's perspective."""
         score = 0.0
-        above_50  = stats.get("ratio_above_ma_50")
-        above_200 = stats.get("ratio_above_ma_200")
-        mom_dir   = stats.get("momentum_direction")
-        mom_roc   = stats.get("momentum_roc")
+        sign = 1 if favor_a else -1   # A-positive values count for A, negative for B
 
         # --- Statistical (4 × 10 = 40 pts) ---
 
         # 1. 50d MA (0-10): aligned = base 5, plus up to 5 more for distance
-        ratio_val = stats.get("current_ratio")
-        ma_50_val = stats.get("ratio_ma_50")
         if ratio_val is not None and ma_50_val is not None and ma_50_val != 0:
-            pct_from_ma = (ratio_val - ma_50_val) / ma_50_val * 100
-            if favor_a and pct_from_ma > 0:
-                score += min(10, 5 + min(abs(pct_from_ma) * 2, 5))
-            elif not favor_a and pct_from_ma < 0:
-                score += min(10, 5 + min(abs(pct_from_ma) * 2, 5))
-            elif favor_a and pct_from_ma <= 0:
-                score += max(0, 2 - abs(pct_from_ma))  # close but wrong side
-            elif not favor_a and pct_from_ma >= 0:
-                score += max(0, 2 - abs(pct_from_ma))
+            pct_from_ma = sign * (ratio_val - ma_50_val) / ma_50_val * 100
+            if pct_from_ma > 0:
+                score += min(10, 5 + min(pct_from_ma * 2, 5))
+            else:
+                score += max(0, 2 + pct_from_ma)  # close but wrong side
 
         # 2. 200d MA (0-10): same logic, slightly more weight for long-term
-        ma_200_val = stats.get("ratio_ma_200")
         if ratio_val is not None and ma_200_val is not None and ma_200_val != 0:
-            pct_from_ma = (ratio_val - ma_200_val) / ma_200_val * 100
-            if favor_a and pct_from_ma > 0:
-                score += min(10, 5 + min(abs(pct_from_ma) * 1.5, 5))
-            elif not favor_a and pct_from_ma < 0:
-                score += min(10, 5 + min(abs(pct_from_ma) * 1.5, 5))
-            elif favor_a and pct_from_ma <= 0:
-                score += max(0, 2 - abs(pct_from_ma))
-            elif not favor_a and pct_from_ma >= 0:
-                score += max(0, 2 - abs(pct_from_ma))
+            pct_from_ma = sign * (ratio_val - ma_200_val) / ma_200_val * 100
+            if pct_from_ma > 0:
+                score += min(10, 5 + min(pct_from_ma * 1.5, 5))
+            else:
+                score += max(0, 2 + pct_from_ma)
 
         # 3. Momentum ROC (0-10): direction match + magnitude
         if mom_roc is not None:
-            abs_roc = abs(mom_roc)
-            if favor_a and mom_roc > 0:
-                score += min(10, 4 + min(abs_roc * 1.5, 6))
-            elif not favor_a and mom_roc < 0:
-                score += min(10, 4 + min(abs_roc * 1.5, 6))
+            signed_roc = sign * mom_roc
+            if signed_roc > 0:
+                score += min(10, 4 + min(signed_roc * 1.5, 6))
             elif mom_dir == "FLAT":
                 score += 2  # flat = slight ambiguity
 
         # 4. Return differential (0-10): largest available differential
-        rel_ret = stats.get("relative_returns", {})
-        best_diff = None
-        for period in ["1mo", "3mo", "6mo"]:
-            d = rel_ret.get(period, {}).get("differential")
-            if d is not None:
-                best_diff = d
-                break
         if best_diff is not None:
-            abs_diff = abs(best_diff)
-            if favor_a and best_diff > 0:
-                score += min(10, 3 + min(abs_diff * 0.7, 7))
-            elif not favor_a and best_diff < 0:
-                score += min(10, 3 + min(abs_diff * 0.7, 7))
+            signed_diff = sign * best_diff
+            if signed_diff > 0:
+                score += min(10, 3 + min(signed_diff * 0.7, 7))
 
         # --- Technical (3 × 10 = 30 pts) ---
 
         # 5. RSI on ratio (0-10): distance from 50
-        #    Downweight for short periods (30d/60d) since RSI needs ~14 bars to stabilize
-        rsi_weight = 0.3 if period in ("30d", "60d") else 1.0
-        rsi_val = tech_conf.get("rsi_value")
         if rsi_val is not None:
-            rsi_dev = rsi_val - 50  # positive = favors A, negative = favors B
-            if favor_a and rsi_dev > 0:
-                score += min(10, 3 + min(abs(rsi_dev) * 0.4, 7)) * rsi_weight
-            elif not favor_a and rsi_dev < 0:
-                score += min(10, 3 + min(abs(rsi_dev) * 0.4, 7)) * rsi_weight
+            rsi_dev = sign * (rsi_val - 50)  # positive = favors this direction
+            if rsi_dev > 0:
+                score += min(10, 3 + min(rsi_dev * 0.4, 7)) * rsi_weight
             elif abs(rsi_dev) < 5:
                 score += 2 * rsi_weight  # near neutral, slight credit
 
         # 6. MACD histogram (0-10): sign + magnitude
-        macd_hist = tech_conf.get("macd_hist")
-        if macd_hist is not None:
-            if favor_a and macd_hist > 0:
-                score += min(10, 5 + min(abs(macd_hist) * 50, 5))
-            elif not favor_a and macd_hist < 0:
-                score += min(10, 5 + min(abs(macd_hist) * 50, 5))
+        if macd_hist is not None and sign * macd_hist > 0:
+            score += min(10, 5 + min(sign * macd_hist * 50, 5))
 
         # 7. Bollinger Band / overall tech count (0-10)
-        fa = tech_conf.get("favors_a_count", 0)
-        fb = tech_conf.get("favors_b_count", 0)
         total_tech = fa + fb if (fa + fb) > 0 else 1
-        if favor_a and fa > fb:
-            score += min(10, (fa / total_tech) * 10)
-        elif not favor_a and fb > fa:
-            score += min(10, (fb / total_tech) * 10)
+        ours, theirs = (fa, fb) if favor_a else (fb, fa)
+        if ours > theirs:
+            score += min(10, (ours / total_tech) * 10)
         elif fa == fb and fa > 0:
             score += 3  # tied signals
 
         # --- Context (3 × 10 = 30 pts) ---
 
-        # 8. Correlation (0-10): higher abs correlation = more meaningful pair
-        corr = stats.get("correlation", 0) or 0
-        score += min(10, abs(corr) * 10)
-
-        # 9. Hurst exponent (0-10): >0.5 = trending
-        hurst = stats.get("hurst_exponent")
-        if hurst is not None:
-            if hurst > 0.5:
-                score += min(10, (hurst - 0.5) * 20)  # 0.5→0, 0.6→2, 0.75→5, 1.0→10
-            else:
-                score += max(0, hurst * 4)  # some credit for near-0.5
+        # 8 & 9. Correlation and Hurst (precomputed above)
+        score += corr_score
+        score += hurst_score
 
         # 10. Technical direction confirms (0-10): alignment bonus
         target_dir = "FAVORS_A" if favor_a else "FAVORS_B"
@@ -457,6 +495,21 @@ def _compute_conviction(analysis: dict, technicals: dict, ai_rec: dict, period:
 
 # ── Entry Point ──────────────────────────────────────────────────────────────
 
+def _server_backends() -> dict:
+    """uvloop + httptools when installed (not available on Windows), else stock asyncio + h11."""
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    try:
+        import httptools  # noqa: F401
+        http = "httptools"
+    except ImportError:
+        http = "h11"
+    return {"loop": loop, "http": http}
+
+
 if __name__ == "__main__":
     is_dev = os.getenv("RAILWAY_ENVIRONMENT") is None
     print()
@@ -466,4 +519,4 @@ if __name__ == "__main__":
     print(f"  |    http://localhost:{PORT}                  |")
     print("  +==========================================+")
     print()
-    uvicorn.run("app:app", host=HOST, port=PORT, reload=is_dev)
+    uvicorn.run("app:app", host=HOST, port=PORT, reload=is_dev, **_server_backends())
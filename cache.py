@@ -0,0 +1,104 @@
+"""Small in-process caches shared across the analysis pipeline."""
+
+import time
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe bounded mapping with least-recently-used eviction and an
+    optional per-entry time-to-live (seconds).
+    Safe to share between the event loop and asyncio.to_thread workers.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def memoize(maxsize: int = 128, ttl: float | None = None, cache_if=lambda result: result is not None):
+    """
+    Decorator: cache a function's results in an LRUCache keyed on its arguments.
+
+    Calls are single-flight — concurrent callers with the same arguments wait
+    for the first one instead of repeating the work. Results for which
+    `cache_if(result)` is false (by default None, i.e. failures) are returned
+    but not stored. The cache is exposed as `wrapper.cache`.
+    """
+    def decorator(fn):
+        cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        inflight = {}  # key -> Lock held by the thread computing it
+        inflight_guard = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            result = cache.get(key, _MISSING)
+            if result is not _MISSING:
+                return result
+
+            with inflight_guard:
+                lock = inflight.setdefault(key, threading.Lock())
+            try:
+                with lock:
+                    result = cache.get(key, _MISSING)
+                    if result is _MISSING:
+                        result = fn(*args, **kwargs)
+                        if cache_if(result):
+                            cache.put(key, result)
+                    return result
+            finally:
+                with inflight_guard:
+                    if inflight.get(key) is lock:
+                        del inflight[key]
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def array_key(*arrays: np.ndarray) -> bytes:
+    """128-bit content hash of one or more numeric arrays (values and lengths)."""
+    h = hashlib.blake2b(digest_size=16)
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr, dtype=np.float64)
+        h.update(arr.size.to_bytes(8, "little"))
+        h.update(arr.tobytes())
+    return h.digest()
@@ -1,21 +1,30 @@
 """Configuration for WhichTicker — Relative Performance Analyzer."""
 
 import os
+import re
 
 # ── Load .env ────────────────────────────────────────────────────────────────
+# KEY=value per line; optional matching quotes around the value, blank values
+# and comment lines ignored.
+_ENV_RE = re.compile(
+    rb"^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*([\"']?)([^\r\n]*?)\2[ \t]*\r?$",
+    re.M,
+)
+
+
 def _load_env():
     env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
     try:
-        if os.path.exists(env_path):
-            with open(env_path) as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith("#") and "=" in line:
-                        key, _, val = line.partition("=")
-                        val = val.strip().strip('"').strip("'")
-                        key = key.strip()
-                        if val:  # Only set if value is non-empty
-                            os.environ[key] = val
+        with open(env_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return
+    try:
+        os.environ.update({
+            m.group(1).decode(): m.group(3).decode()
+            for m in _ENV_RE.finditer(data)
+            if m.group(3)  # Only set if value is non-empty
+        })
     except Exception:
         pass
 
@@ -82,6 +91,14 @@ MACD_SIGNAL  = 9
 BB_PERIOD    = 20
 BB_STD       = 2
 
+# ── Market Data Cache ───────────────────────────────────────────────────────
+# yfinance responses are cached in-process. Daily history includes today's
+# still-moving bar, so price data expires quickly; symbol search is static.
+PRICE_CACHE_TTL  = 300      # seconds — history, chart series, ticker validation
+SEARCH_CACHE_TTL = 86400    # seconds — symbol search results
+NAME_CACHE_TTL   = 86400    # seconds — display names (Ticker.info lookups)
+MARKET_CACHE_SIZE = 256     # max entries per cached function
+
 # ── Server ───────────────────────────────────────────────────────────────────
 HOST = "0.0.0.0"
 PORT = int(os.getenv("PORT", "8060"))  # Railway sets PORT dynamically
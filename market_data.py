@@ -1,9 +1,31 @@
 """Market data fetching via yfinance."""
 
+
 import yfinance as yf
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
+from cache import LRUCache, memoize
+from config import (
+    PRICE_CACHE_TTL, SEARCH_CACHE_TTL, NAME_CACHE_TTL, MARKET_CACHE_SIZE,
+)
+
+# One HTTP session for every yfinance call, so concurrent lookups share a pooled
+# keep-alive connection (no per-call TLS handshake) and Yahoo's cookie/crumb.
+# Yahoo rate-limits non-browser clients, so this must be curl_cffi's
+# browser-impersonating session (what yfinance uses itself); without curl_cffi,
+# session handling is left to yfinance.
+try:
+    from curl_cffi import requests as curl_requests
+    _SESSION = curl_requests.Session(impersonate="chrome")
+except ImportError:
+    _SESSION = None
+
+# symbol -> display name. Names rarely change and each miss is a separate
+# Ticker.info HTTP round-trip, so they outlive the price caches.
+_NAME_CACHE = LRUCache(maxsize=4096, ttl=NAME_CACHE_TTL)
+
 
 def _min_days_for_period(period: str) -> int:
     """Return minimum required trading days based on the lookback period."""
@@ -17,86 +39,100 @@ def _yf_period(period: str) -> str:
     return {"30d": "1mo", "60d": "3mo"}.get(period, period)
 
 
-def fetch_pair_data(
-    ticker_a: str, ticker_b: str, period: str = "1y"
-) -> tuple[pd.DataFrame, pd.DataFrame] | tuple[None, str]:
+def ticker_name(symbol: str, ticker: yf.Ticker | None = None) -> str:
     """
-    Fetch historical close prices for two tickers and align on common dates.
-
-    Returns (df_a, df_b) on success, or (None, error_message) on failure.
+    Display name for a symbol (shortName → longName → symbol), cached.
+    Pass an existing yf.Ticker to reuse it on a cache miss. Failed lookups
+    fall back to the symbol and are not cached.
     """
+    symbol = symbol.upper()
+    name = _NAME_CACHE.get(symbol)
+    if name is not None:
+        return name
     try:
-        yf_period = _yf_period(period)
-        hist_a = yf.Ticker(ticker_a).history(period=yf_period)
-        hist_b = yf.Ticker(ticker_b).history(period=yf_period)
-
-        failed = []
-        if hist_a.empty:
-            failed.append(ticker_a)
-        if hist_b.empty:
-            failed.append(ticker_b)
-        if failed:
-            return None, f"No data returned for: {', '.join(failed)}. Check that the ticker(s) are valid."
-
-        # Align on common dates (inner join)
-        close_a = hist_a[["Close"]].rename(columns={"Close": "close"})
-        close_b = hist_b[["Close"]].rename(columns={"Close": "close"})
-        close_a, close_b = close_a.align(close_b, join="inner")
-
-        # Drop any rows with NaN
-        mask = close_a["close"].notna() & close_b["close"].notna()
-        close_a = close_a[mask]
-        close_b = close_b[mask]
-
-        # For 30d/60d, trim to exact calendar day window from today
-        day_trim = {"30d": 30, "60d": 60}.get(period)
-        if day_trim:
-            cutoff = datetime.now() - timedelta(days=day_trim)
-            close_a = close_a[close_a.index.tz_localize(None) >= cutoff]
-            close_b = close_b[close_b.index.tz_localize(None) >= cutoff]
+        info = (ticker or yf.Ticker(symbol, session=_SESSION)).info
+    except Exception:
+        return symbol
+    name = info.get("shortName") or info.get("longName") or symbol
+    _NAME_CACHE.put(symbol, name)
+    return name
 
-        min_days = _min_days_for_period(period)
-        if len(close_a) < min_days:
-            return None, f"Not enough overlapping data for {ticker_a} and {ticker_b} over the selected period (need at least {min_days} trading days, got {len(close_a)})."
 
-        return close_a, close_b
+@memoize(maxsize=MARKET_CACHE_SIZE, ttl=PRICE_CACHE_TTL, cache_if=lambda df: not df.empty)
+def fetch_history(ticker: str, period: str = "1y") -> pd.DataFrame:
+    """
+    Fetch daily OHLCV history for one ticker (empty DataFrame if unknown).
+    Network errors propagate. Non-empty results are cached for PRICE_CACHE_TTL
+    and shared between callers — treat them as read-only.
+    """
+    return yf.Ticker(ticker, session=_SESSION).history(period=_yf_period(period))
 
-    except Exception as e:
-        print(f"  Error fetching pair data ({ticker_a}, {ticker_b}): {e}")
-        return None, f"Error fetching data: {e}"
 
+def align_pair(
+    hist_a: pd.DataFrame, hist_b: pd.DataFrame, ticker_a: str, ticker_b: str, period: str = "1y"
+) -> tuple[pd.DataFrame, pd.DataFrame] | tuple[None, str]:
+    """
+    Align two tickers' close prices on common dates.
 
+    Returns (df_a, df_b) on success, or (None, error_message) on failure.
+    """
+    failed = []
+    if hist_a.empty:
+        failed.append(ticker_a)
+    if hist_b.empty:
+        failed.append(ticker_b)
+    if failed:
+        return None, f"No data returned for: {', '.join(failed)}. Check that the ticker(s) are valid."
+
+    # Align on common dates (inner join), dropping dates where either close is NaN
+    idx = hist_a.index.intersection(hist_b.index)
+    close_a = hist_a["Close"].reindex(idx).to_numpy(dtype=np.float64)
+    close_b = hist_b["Close"].reindex(idx).to_numpy(dtype=np.float64)
+    valid = ~(np.isnan(close_a) | np.isnan(close_b))
+
+    # For 30d/60d, trim to exact calendar day window from today
+    day_trim = {"30d": 30, "60d": 60}.get(period)
+    if day_trim:
+        cutoff = datetime.now() - timedelta(days=day_trim)
+        valid &= idx.tz_localize(None) >= cutoff
+
+    idx = idx[valid]
+    close_a = pd.DataFrame({"close": close_a[valid]}, index=idx)
+    close_b = pd.DataFrame({"close": close_b[valid]}, index=idx)
+
+    min_days = _min_days_for_period(period)
+    if len(close_a) < min_days:
+        return None, f"Not enough overlapping data for {ticker_a} and {ticker_b} over the selected period (need at least {min_days} trading days, got {len(close_a)})."
+
+    return close_a, close_b
+
+
+@memoize(maxsize=MARKET_CACHE_SIZE, ttl=PRICE_CACHE_TTL)
 def validate_ticker(ticker: str) -> dict | None:
     """Validate that a ticker exists and return basic info."""
     try:
-        t = yf.Ticker(ticker)
+        t = yf.Ticker(ticker, session=_SESSION)
         hist = t.history(period="5d")
         if hist.empty:
             return None
 
-        name = ticker.upper()
-        try:
-            info = t.info
-            name = info.get("shortName") or info.get("longName") or ticker.upper()
-        except Exception:
-            pass
-
         return {
             "symbol": ticker.upper(),
-            "name": name,
+            "name": ticker_name(ticker, t),
             "last_price": round(float(hist["Close"].iloc[-1]), 2),
         }
     except Exception:
         return None
 
 
+@memoize(maxsize=MARKET_CACHE_SIZE, ttl=PRICE_CACHE_TTL)
 def get_price_series(ticker: str, period: str = "1y") -> dict | None:
     """
     Fetch price data for a single ticker, formatted for charting.
     Returns dict with 'dates' (ISO strings) and 'prices' (floats).
     """
     try:
-        hist = yf.Ticker(ticker).history(period=_yf_period(period))
+        hist = fetch_history(ticker, period)
         if hist.empty:
             return None
         # Trim to exact window for 30d/60d
@@ -105,19 +141,12 @@ def get_price_series(ticker: str, period: str = "1y") -> dict | None:
             cutoff = datetime.now() - timedelta(days=day_trim)
             hist = hist[hist.index.tz_localize(None) >= cutoff]
 
-        dates = [d.strftime("%Y-%m-%d") for d in hist.index]
-        prices = [round(float(p), 2) for p in hist["Close"]]
-
-        name = ticker.upper()
-        try:
-            info = yf.Ticker(ticker).info
-            name = info.get("shortName") or info.get("longName") or ticker.upper()
-        except Exception:
-            pass
+        dates = hist.index.strftime("%Y-%m-%d").tolist()
+        prices = np.round(hist["Close"].to_numpy(dtype=np.float64), 2).tolist()
 
         return {
             "symbol": ticker.upper(),
-            "name": name,
+            "name": ticker_name(ticker),
             "dates": dates,
             "prices": prices,
         }
@@ -126,11 +155,12 @@ def get_price_series(ticker: str, period: str = "1y") -> dict | None:
         return None
 
 
+@memoize(maxsize=MARKET_CACHE_SIZE, ttl=SEARCH_CACHE_TTL, cache_if=bool)
 def search_tickers(query: str, max_results: int = 8) -> list[dict]:
     """Search for tickers matching a query string via yfinance."""
     try:
         results = []
-        search = yf.Search(query, max_results=max_results)
+        search = yf.Search(query, max_results=max_results, session=_SESSION)
         if hasattr(search, "quotes") and search.quotes:
             for item in search.quotes:
                 results.append({
@@ -44,4 +44,4 @@ echo "  |    http://localhost:${PORT}                  |"
 echo "  +==========================================+"
 echo ""
 
-exec uvicorn app:app --host 0.0.0.0 --port "$PORT"
+exec uvicorn app:app --host 0.0.0.0 --port "$PORT" --loop uvloop --http httptools
@@ -1,13 +1,214 @@
 """Technical indicators computed on the price ratio series."""
 
+import math
+
 import numpy as np
 import pandas as pd
+from analysis import _last_valid
+from _njit import njit, types, NUMBA_AVAILABLE, F8_1D, F8_1D_RO, F8_2D, F8_2D_RO
 from config import RSI_PERIOD, MACD_FAST, MACD_SLOW, MACD_SIGNAL, BB_PERIOD, BB_STD
 
 
-def _safe_list(series: pd.Series) -> list:
-    """Convert pandas Series to JSON-safe list (NaN → None)."""
-    return [round(float(v), 4) if not np.isnan(v) else None for v in series]
+def _safe_list(values: pd.Series | np.ndarray) -> list:
+    """Convert pandas Series / array to JSON-safe list (NaN → None)."""
+    arr = np.round(np.asarray(values, dtype=np.float64), 4)
+    out = arr.tolist()
+    # NaNs are typically just the indicator warm-up at the head
+    for i in np.flatnonzero(np.isnan(arr)).tolist():
+        out[i] = None
+    return out
+
+
+# ── Kernels ──────────────────────────────────────────────────────────────────
+# Single-pass loops over raw float64 arrays, writing only their outputs. The
+# EWM recurrence mirrors pandas' ewm().mean() step for step (including the
+# constant-series guard), so RSI and MACD match the pandas results exactly.
+# No fastmath here for the same reason. nogil lets kernels running in
+# to_thread workers overlap.
+#
+# Explicit (argument) signatures → compiled eagerly at import, or loaded from
+# the on-disk cache, so the first /api/analyze request doesn't pay for JIT.
+# Without numba they are None and the kernels run as plain Python.
+if NUMBA_AVAILABLE:
+    _I8, _F8 = types.int64, types.float64
+    _EWM_STEP_SIGS = [(_F8, _F8, _F8, _F8)]
+    _RSI_BATCH_SIGS = [(F8_2D, _I8), (F8_2D_RO, _I8)]
+    _RSI_SIGS = [(F8_1D, _I8), (F8_1D_RO, _I8)]
+    _MACD_SIGS = [(F8_1D, _I8, _I8, _I8), (F8_1D_RO, _I8, _I8, _I8)]
+    _BB_SIGS = [(F8_1D, _I8, _F8), (F8_1D_RO, _I8, _F8)]
+else:
+    _EWM_STEP_SIGS = _RSI_BATCH_SIGS = _RSI_SIGS = _MACD_SIGS = _BB_SIGS = None
+
+@njit(_EWM_STEP_SIGS, cache=True, nogil=True)
+def _ewm_step(weighted: float, old_wt: float, cur: float, alpha: float):
+    """
+    One step of pandas' ewm(adjust=False).mean() recurrence (ignore_na=False).
+    Returns the updated (weighted, old_wt); start from (x[0], 1.0).
+    """
+    if not np.isnan(weighted):
+        old_wt *= 1.0 - alpha
+        if not np.isnan(cur):
+            if weighted != cur:
+                weighted = old_wt * weighted + alpha * cur
+                weighted = weighted / (old_wt + alpha)
+            old_wt = 1.0
+    elif not np.isnan(cur):
+        weighted = cur
+    return weighted, old_wt
+
+
+@njit(_RSI_BATCH_SIGS, cache=True, nogil=True)
+def _rsi_batch(mat: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder RSI for each column of an (N, k) price matrix in one pass over the
+    rows. Gain and loss share their EWM weights, since a NaN diff is missing
+    from both; the smoothing is pandas' adjust=True EWM recurrence.
+    """
+    n, m = mat.shape
+    out = np.empty((n, m))
+    alpha = 1.0 / period
+    alpha = 1.0 / (1.0 + (1.0 - alpha) / alpha)   # via center of mass, as pandas does
+    old_wt_factor = 1.0 - alpha
+    new_wt = 1.0
+
+    avg_gain = np.full(m, np.nan)
+    avg_loss = np.full(m, np.nan)
+    old_wt = np.ones(m)
+    nobs = np.zeros(m, dtype=np.int64)
+    if n > 0:
+        out[0, :] = np.nan
+
+    for i in range(1, n):
+        for j in range(m):
+            d = mat[i, j] - mat[i - 1, j]
+            is_obs = not np.isnan(d)
+            if is_obs:
+                nobs[j] += 1
+                if d > 0:
+                    g = d
+                    l = 0.0
+                else:
+                    g = 0.0
+                    l = -d
+                if np.isnan(avg_gain[j]):
+                    avg_gain[j] = g
+                    avg_loss[j] = l
+                else:
+                    ow = old_wt[j] * old_wt_factor
+                    if avg_gain[j] != g:
+                        avg_gain[j] = (ow * avg_gain[j] + new_wt * g) / (ow + new_wt)
+                    if avg_loss[j] != l:
+                        avg_loss[j] = (ow * avg_loss[j] + new_wt * l) / (ow + new_wt)
+                    old_wt[j] = ow + new_wt
+            elif not np.isnan(avg_gain[j]):
+                old_wt[j] *= old_wt_factor
+
+            ag = avg_gain[j]
+            al = avg_loss[j]
+            if nobs[j] < period or np.isnan(ag):
+                out[i, j] = np.nan
+            elif al == 0.0:
+                out[i, j] = 100.0 if ag > 0.0 else np.nan   # g/0 → RSI 100; 0/0 → undefined
+            else:
+                out[i, j] = 100.0 - 100.0 / (1.0 + ag / al)
+    return out
+
+
+@njit(_RSI_SIGS, cache=True, nogil=True)
+def _rsi_wilder(x: np.ndarray, period: int) -> np.ndarray:
+    """RSI with Wilder smoothing (alpha = 1/period, first `period` values NaN)."""
+    return _rsi_batch(x.reshape((x.shape[0], 1)), period)[:, 0]
+
+
+@njit(_MACD_SIGS, cache=True, nogil=True)
+def _macd_loop(x: np.ndarray, fast: int, slow: int, signal: int):
+    """
+    MACD line, signal line and histogram from span-based EMAs (adjust=False).
+    All three EMAs advance together in one pass — no intermediate EMA arrays.
+    """
+    n = x.shape[0]
+    macd_line = np.empty(n)
+    signal_line = np.empty(n)
+    histogram = np.empty(n)
+    if n == 0:
+        return macd_line, signal_line, histogram
+    # alpha via center of mass, as pandas does
+    alpha_fast = 1.0 / (1.0 + (fast - 1) / 2.0)
+    alpha_slow = 1.0 / (1.0 + (slow - 1) / 2.0)
+    alpha_signal = 1.0 / (1.0 + (signal - 1) / 2.0)
+
+    ema_fast = x[0]
+    ema_slow = x[0]
+    wt_fast = 1.0
+    wt_slow = 1.0
+    m = ema_fast - ema_slow
+    ema_signal = m
+    wt_signal = 1.0
+    macd_line[0] = m
+    signal_line[0] = ema_signal
+    histogram[0] = m - ema_signal
+    for i in range(1, n):
+        ema_fast, wt_fast = _ewm_step(ema_fast, wt_fast, x[i], alpha_fast)
+        ema_slow, wt_slow = _ewm_step(ema_slow, wt_slow, x[i], alpha_slow)
+        m = ema_fast - ema_slow
+        ema_signal, wt_signal = _ewm_step(ema_signal, wt_signal, m, alpha_signal)
+        macd_line[i] = m
+        signal_line[i] = ema_signal
+        histogram[i] = m - ema_signal
+    return macd_line, signal_line, histogram
+
+
+@njit(_BB_SIGS, cache=True, nogil=True)
+def _bb_loop(x: np.ndarray, period: int, k: float):
+    """
+    Rolling SMA ± k·std (ddof=1) in O(n). Each window is seeded with a two-pass
+    mean/M2, then slid with a Welford update (no sum-of-squares cancellation).
+    A window containing NaN yields NaN, as with pandas rolling.
+    """
+    n = x.shape[0]
+    upper = np.full(n, np.nan)
+    middle = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    last_nan = -1
+    mean = 0.0
+    m2 = 0.0
+    prev_valid = False
+    for i in range(n):
+        if np.isnan(x[i]):
+            last_nan = i
+        if i - last_nan < period:
+            prev_valid = False
+            continue
+        if not prev_valid:
+            start = i - period + 1
+            mean = 0.0
+            for j in range(start, i + 1):
+                mean += x[j]
+            mean /= period
+            m2 = 0.0
+            for j in range(start, i + 1):
+                d = x[j] - mean
+                m2 += d * d
+            prev_valid = True
+        else:
+            old = x[i - period]
+            new = x[i]
+            delta = new - old
+            new_mean = mean + delta / period
+            m2 += delta * (new - new_mean + old - mean)
+            mean = new_mean
+        if period > 1:
+            sd = math.sqrt(m2 / (period - 1)) if m2 > 0.0 else 0.0
+        else:
+            sd = np.nan
+        middle[i] = mean
+        upper[i] = mean + k * sd
+        lower[i] = mean - k * sd
+    return upper, middle, lower
+
+
+def _values(series: pd.Series) -> np.ndarray:
+    return np.ascontiguousarray(series.to_numpy(dtype=np.float64))
 
 
 # ── RSI ──────────────────────────────────────────────────────────────────────
@@ -16,16 +217,7 @@ def compute_rsi(series: pd.Series, period: int = RSI_PERIOD) -> pd.Series:
     """
     Relative Strength Index using Wilder's smoothing.
     """
-    delta = series.diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-
-    avg_gain = gain.ewm(alpha=1 / period, min_periods=period).mean()
-    avg_loss = loss.ewm(alpha=1 / period, min_periods=period).mean()
-
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    return pd.Series(_rsi_wilder(_values(series), period), index=series.index)
 
 
 # ── MACD ─────────────────────────────────────────────────────────────────────
@@ -41,16 +233,13 @@ def compute_macd(
     Signal = EMA of MACD.
     Histogram = MACD - Signal.
     """
-    ema_fast   = series.ewm(span=fast, adjust=False).mean()
-    ema_slow   = series.ewm(span=slow, adjust=False).mean()
-    macd_line  = ema_fast - ema_slow
-    signal_line = macd_line.ewm(span=signal, adjust=False).mean()
-    histogram  = macd_line - signal_line
+    macd_line, signal_line, histogram = _macd_loop(_values(series), fast, slow, signal)
+    index = series.index
 
     return {
-        "macd_line":   macd_line,
-        "signal_line": signal_line,
-        "histogram":   histogram,
+        "macd_line":   pd.Series(macd_line, index=index),
+        "signal_line": pd.Series(signal_line, index=index),
+        "histogram":   pd.Series(histogram, index=index),
     }
 
 
@@ -65,33 +254,35 @@ def compute_bollinger_bands(
     Bollinger Bands on the ratio.
     Middle = SMA, Upper/Lower = SMA +/- std_dev * rolling_std.
     """
-    middle = series.rolling(window=period).mean()
-    rolling_std = series.rolling(window=period).std()
-    upper = middle + std_dev * rolling_std
-    lower = middle - std_dev * rolling_std
+    upper, middle, lower = _bb_loop(_values(series), period, float(std_dev))
+    index = series.index
 
     return {
-        "upper":  upper,
-        "middle": middle,
-        "lower":  lower,
+        "upper":  pd.Series(upper, index=index),
+        "middle": pd.Series(middle, index=index),
+        "lower":  pd.Series(lower, index=index),
     }
 
 
 # ── Individual RSI for Comparison ─────────────────────────────────────────────
 
-def compute_individual_rsi(prices_a: pd.Series, prices_b: pd.Series) -> dict:
+def compute_individual_rsi(prices_a: pd.Series, prices_b: pd.Series, want_series: bool = True) -> dict:
     """
     Compute RSI on each individual ticker for side-by-side comparison.
+    Expects the aligned (equal-length) price series. With want_series=False
+    the per-date RSI lists are None and only the current values are filled.
     """
-    rsi_a = compute_rsi(prices_a)
-    rsi_b = compute_rsi(prices_b)
+    mat = np.column_stack((_values(prices_a), _values(prices_b)))
+    rsi = _rsi_batch(mat, RSI_PERIOD)
+    rsi_a = rsi[:, 0]
+    rsi_b = rsi[:, 1]
 
-    current_rsi_a = float(rsi_a.dropna().iloc[-1]) if len(rsi_a.dropna()) > 0 else None
-    current_rsi_b = float(rsi_b.dropna().iloc[-1]) if len(rsi_b.dropna()) > 0 else None
+    current_rsi_a = _last_valid(rsi_a)
+    current_rsi_b = _last_valid(rsi_b)
 
     return {
-        "rsi_a": _safe_list(rsi_a),
-        "rsi_b": _safe_list(rsi_b),
+        "rsi_a": _safe_list(rsi_a) if want_series else None,
+        "rsi_b": _safe_list(rsi_b) if want_series else None,
         "current_rsi_a": round(current_rsi_a, 1) if current_rsi_a is not None else None,
         "current_rsi_b": round(current_rsi_b, 1) if current_rsi_b is not None else None,
     }
@@ -99,7 +290,19 @@ def compute_individual_rsi(prices_a: pd.Series, prices_b: pd.Series) -> dict:
 
 # ── Technical Confirmation Signal ────────────────────────────────────────────
 
-def technical_confirmation(rsi: pd.Series, macd: dict, ratio: pd.Series, bb: dict) -> dict:
+def _tails(rsi, histogram, ratio, upper, lower, middle) -> dict:
+    """Latest valid value of each input technical_confirmation reads (with its defaults)."""
+    return {
+        "rsi":    _last_valid(rsi, 50),
+        "hist":   _last_valid(histogram, 0),
+        "ratio":  _last_valid(ratio, 0),
+        "upper":  _last_valid(upper, 0),
+        "lower":  _last_valid(lower, 0),
+        "middle": _last_valid(middle, 0),
+    }
+
+
+def technical_confirmation(rsi: pd.Series, macd: dict, ratio: pd.Series, bb: dict, tails: dict | None = None) -> dict:
     """
     Determine whether technical indicators confirm the relative performance signal.
 
@@ -112,13 +315,18 @@ def technical_confirmation(rsi: pd.Series, macd: dict, ratio: pd.Series, bb: dic
       - RSI < 50 on ratio
       - MACD histogram negative
       - Ratio near/below lower Bollinger Band (B strongly outperforming)
+
+    Only the latest values are used; pass `tails` (see _tails) if they are
+    already known, otherwise they are read from the series.
     """
-    latest_rsi = rsi.dropna().iloc[-1] if len(rsi.dropna()) > 0 else 50
-    latest_hist = macd["histogram"].dropna().iloc[-1] if len(macd["histogram"].dropna()) > 0 else 0
-    latest_ratio = ratio.dropna().iloc[-1] if len(ratio.dropna()) > 0 else 0
-    latest_upper = bb["upper"].dropna().iloc[-1] if len(bb["upper"].dropna()) > 0 else 0
-    latest_lower = bb["lower"].dropna().iloc[-1] if len(bb["lower"].dropna()) > 0 else 0
-    latest_middle = bb["middle"].dropna().iloc[-1] if len(bb["middle"].dropna()) > 0 else 0
+    if tails is None:
+        tails = _tails(rsi, macd["histogram"], ratio, bb["upper"], bb["lower"], bb["middle"])
+    latest_rsi = tails["rsi"]
+    latest_hist = tails["hist"]
+    latest_ratio = tails["ratio"]
+    latest_upper = tails["upper"]
+    latest_lower = tails["lower"]
+    latest_middle = tails["middle"]
 
     favors_a_count = 0
     favors_b_count = 0
@@ -177,30 +385,48 @@ def technical_confirmation(rsi: pd.Series, macd: dict, ratio: pd.Series, bb: dic
 
 # ── Master Function ──────────────────────────────────────────────────────────
 
-def compute_all_technicals(ratio: pd.Series) -> dict:
+def compute_all_technicals(ratio: pd.Series, want_series: bool = True) -> dict:
     """
     Compute all technical indicators on the price ratio and return
     a JSON-serializable dict.
-    """
-    rsi  = compute_rsi(ratio)
-    macd = compute_macd(ratio)
-    bb   = compute_bollinger_bands(ratio)
 
-    confirmation = technical_confirmation(rsi, macd, ratio, bb)
+    With want_series=False the per-date indicator blocks (rsi, macd,
+    bollinger) are None and only "confirmation" is populated — the
+    indicators still run over the full series, they just aren't serialized.
+    """
+    # Kernels straight on the raw array — the outputs are only serialized and
+    # summarized, so they never need wrapping in Series.
+    values = _values(ratio)
+    rsi = _rsi_wilder(values, RSI_PERIOD)
+    macd_line, signal_line, histogram = _macd_loop(values, MACD_FAST, MACD_SLOW, MACD_SIGNAL)
+    upper, middle, lower = _bb_loop(values, BB_PERIOD, float(BB_STD))
+
+    macd = {"macd_line": macd_line, "signal_line": signal_line, "histogram": histogram}
+    bb = {"upper": upper, "middle": middle, "lower": lower}
+    tails = _tails(rsi, histogram, values, upper, lower, middle)
+    confirmation = technical_confirmation(rsi, macd, values, bb, tails)
+
+    if not want_series:
+        return {
+            "rsi":          None,
+            "macd":         None,
+            "bollinger":    None,
+            "confirmation": confirmation,
+        }
 
     return {
         "rsi": {
             "values": _safe_list(rsi),
         },
         "macd": {
-            "macd_line":   _safe_list(macd["macd_line"]),
-            "signal_line": _safe_list(macd["signal_line"]),
-            "histogram":   _safe_list(macd["histogram"]),
+            "macd_line":   _safe_list(macd_line),
+            "signal_line": _safe_list(signal_line),
+            "histogram":   _safe_list(histogram),
         },
         "bollinger": {
-            "upper":  _safe_list(bb["upper"]),
-            "middle": _safe_list(bb["middle"]),
-            "lower":  _safe_list(bb["lower"]),
+            "upper":  _safe_list(upper),
+            "middle": _safe_list(middle),
+            "lower":  _safe_list(lower),
         },
         "confirmation": confirmation,
     }